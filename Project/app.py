@@ -1,4 +1,5 @@
 import streamlit as st
+from prediction_model import warm_up_model
 
 # 1) Global page configuration (must be first Streamlit call) 📑
 st.set_page_config(
@@ -8,7 +9,10 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# 2) Declare each page under `views/` with st.Page; mark `landing.py` as default 🏠
+# 2) Load and warm the prediction model once per process (no-op on reruns) 🧠
+warm_up_model()
+
+# 3) Declare each page under `views/` with st.Page; mark `landing.py` as default 🏠
 page_landing         = st.Page("views/landing.py",       title="Welcome",           icon="🏠", default=True)
 page_login           = st.Page("views/login.py",         title="User Login",        icon="🔒")
 page_signup          = st.Page("views/signup.py",        title="Sign Up",           icon="✍️")
@@ -18,7 +22,7 @@ page_forgot_password = st.Page("views/forgot_password.py", title="Forgot Passwor
 page_admin_login     = st.Page("views/admin_login.py",   title="Admin Login",       icon="🛡️")
 page_admin_dashboard = st.Page("views/admin_dashboard.py", title="Admin Panel",      icon="⚙️")
 
-# 3) Build sidebar navigation in the desired order 🚀
+# 4) Build sidebar navigation in the desired order 🚀
 navigator = st.navigation([
     page_landing,
     page_login,
@@ -30,5 +34,5 @@ navigator = st.navigation([
     page_admin_dashboard,
 ])
 
-# 4) Run the selected page
+# 5) Run the selected page
 navigator.run()
\ No newline at end of file
@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import ocr
+from extraction_cache import get_extraction_cache, pdf_digest
+
+DEFAULT_OUTPUT_PATH = "ingest_results.jsonl"
+
+
+def find_pdfs(directory):
+    """Every *.pdf under directory (recursively), in a stable order."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pdf"))
+    return sorted(paths)
+
+
+def read_done(output_path, retry_errors=False):
+    """
+    Paths already recorded in the output JSONL, which doubles as the checkpoint.
+    A line cut short by an interruption is ignored, so that document is redone.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not (retry_errors and record.get("error")):
+                done.add(record["path"])
+    return done
+
+
+def prepare_document(path, use_cache=True):
+    """
+    Read one PDF and extract its pages (text layer or OCR). Runs in a pool worker.
+
+    Returns {"path", "sha256", "pages", "result", "timings"}; result is the
+    cached final JSON when this PDF was already processed with the current prompt.
+    """
+    timings = {}
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        pdf_bytes = f.read()
+    digest = pdf_digest(pdf_bytes)
+    timings["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cache = get_extraction_cache() if use_cache else None
+    result = cache.get_result(digest, ocr.PROMPT_VERSION) if cache is not None else None
+    pages = cache.get_pages(digest) if cache is not None and result is None else None
+    timings["cache"] = time.perf_counter() - start
+
+    if result is None and pages is None:
+        start = time.perf_counter()
+        # One document per worker: OCR its pages serially instead of nesting pools
+        pages = ocr.extract_pages(pdf_bytes, workers=1)
+        if cache is not None:
+            cache.put_pages(digest, pages)
+        timings["extract"] = time.perf_counter() - start
+    if pages is not None:
+        timings.update(pages=len(pages), ocr_pages=sum(page["source"] == "ocr" for page in pages))
+    return {"path": path, "sha256": digest, "pages": pages, "result": result, "timings": timings}
+
+
+async def _extract_stage(paths, pools, queue, max_in_flight, use_cache):
+    """
+    Run prepare_document on pools["pool"]; a full queue holds back further submissions.
+
+    A worker that dies (segfault, OOM) breaks the whole pool and fails every
+    document in flight. The pool is then replaced, and each of those documents
+    is redone alone in a single-worker pool, so only the file that really
+    crashes it is recorded as an error.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max_in_flight)
+    isolated = asyncio.Semaphore(pools["workers"])
+
+    def restart(broken):
+        # Every document in flight sees the same breakage; only the first replaces the pool
+        if pools["pool"] is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            pools["pool"] = ocr._make_ocr_pool(pools["workers"])
+            print("An extraction worker died; restarted the process pool")
+
+    async def prepare_alone(path):
+        async with isolated:
+            solo = ocr._make_ocr_pool(1)
+            try:
+                return await loop.run_in_executor(solo, prepare_document, path, use_cache)
+            except BrokenProcessPool as e:
+                return {"path": path, "error": f"extraction worker crashed on this document: {e!r}", "timings": {}}
+            finally:
+                solo.shutdown(wait=False)
+
+    async def one(path):
+        # The slot is kept until the document is queued, so a slow LLM stage stalls OCR
+        async with slots:
+            submitted = time.perf_counter()
+            pool = pools["pool"]
+            try:
+                try:
+                    doc = await loop.run_in_executor(pool, prepare_document, path, use_cache)
+                except BrokenProcessPool:
+                    restart(pool)
+                    doc = await prepare_alone(path)
+            except Exception as e:
+                doc = {"path": path, "error": f"extraction failed: {e!r}", "timings": {}}
+            doc["timings"]["extract_wall"] = time.perf_counter() - submitted
+            doc["queued"] = time.perf_counter()
+            await queue.put(doc)
+
+    await asyncio.gather(*(one(path) for path in paths))
+
+
+async def _finish_document(doc, use_cache):
+    """Rules + LLM for one prepared document; returns its output record."""
+    timings = doc["timings"]
+    timings["queue_wait"] = time.perf_counter() - doc.pop("queued")
+    record = {"path": doc["path"], "sha256": doc.get("sha256"), "fields": {}, "missing": [], "error": doc.get("error")}
+
+    if record["error"] is None:
+        try:
+            if doc["result"] is not None:
+                fields = doc["result"]
+            else:
+                start = time.perf_counter()
+                fields = {}
+                async for _, _, fields in ocr.iter_fields(doc["pages"], timings):
+                    pass
+                timings["llm_wall"] = time.perf_counter() - start
+                failed = timings.get("llm_pages_failed", 0)
+                if failed:
+                    # Keep the partial fields, but leave it uncached and redo it with --retry-errors
+                    record["error"] = f"{failed} of {timings['llm_pages']} LLM pages failed"
+                elif use_cache:
+                    get_extraction_cache().put_result(doc["sha256"], ocr.PROMPT_VERSION, fields)
+            record["fields"] = fields
+            record["missing"] = [field for field in ocr.TARGET_FIELDS if field not in fields]
+        except Exception as e:
+            record["error"] = f"field extraction failed: {e!r}"
+
+    record["timings"] = timings
+    return record
+
+
+async def _llm_stage(queue, out, use_cache, progress):
+    while True:
+        doc = await queue.get()
+        if doc is None:
+            return
+        record = await _finish_document(doc, use_cache)
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        progress(record)
+
+
+async def _ingest(paths, output_path, workers, queue_size, llm_documents, use_cache):
+    queue = asyncio.Queue(maxsize=queue_size)
+    counts = {"done": 0, "errors": 0}
+    start = time.perf_counter()
+
+    def progress(record):
+        counts["done"] += 1
+        counts["errors"] += record["error"] is not None
+        fields = len(ocr.TARGET_FIELDS)
+        status = "error" if record["error"] else f"{fields - len(record['missing'])}/{fields} fields"
+        rate = counts["done"] / (time.perf_counter() - start)
+        print(f"[{counts['done']}/{len(paths)}] {record['path']}: {status} ({rate:.2f} docs/s)")
+
+    with open(output_path, "a") as out:
+        # Start on a fresh line if an interrupted run left a partial one
+        if out.tell() > 0:
+            with open(output_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    out.write("\n")
+
+        pools = {"pool": ocr._make_ocr_pool(workers), "workers": workers}
+        try:
+            consumers = [asyncio.ensure_future(_llm_stage(queue, out, use_cache, progress)) for _ in range(llm_documents)]
+            await _extract_stage(paths, pools, queue, workers * 2, use_cache)
+            for _ in consumers:
+                await queue.put(None)
+            await asyncio.gather(*consumers)
+        finally:
+            pools["pool"].shutdown(wait=False, cancel_futures=True)
+    return counts
+
+
+def ingest(directory, output_path=DEFAULT_OUTPUT_PATH, workers=None, queue_size=16, llm_documents=4,
+           use_cache=True, retry_errors=False):
+    """
+    Extract every PDF under directory into output_path, one JSONL record per document.
+
+    Page extraction/OCR runs on a process pool (one document per worker, at
+    most 2 x workers in flight); prepared documents wait in a bounded queue
+    for the asyncio LLM stage, which works on llm_documents documents at a
+    time, so neither stage can run far ahead of the other. Documents already
+    in output_path are skipped, which makes an interrupted run resumable.
+    """
+    workers = workers or ocr.OCR_WORKERS
+    paths = find_pdfs(directory)
+    done = read_done(output_path, retry_errors)
+    todo = [path for path in paths if path not in done]
+    print(f"{len(paths)} PDFs found, {len(paths) - len(todo)} already in {output_path}, {len(todo)} to process")
+    if not todo:
+        return {"done": 0, "errors": 0}
+
+    start = time.perf_counter()
+    counts = asyncio.run(_ingest(todo, output_path, workers, queue_size, llm_documents, use_cache))
+    elapsed = time.perf_counter() - start
+    print(f"Done: {counts['done']} documents ({counts['errors']} errors) in {elapsed:.1f}s")
+    return counts
+
+
+def main():
+    """CLI interface for ingesting a directory of medical report PDFs."""
+    parser = argparse.ArgumentParser(
+        description="Extract structured data from every PDF in a directory into a JSONL file."
+    )
+    parser.add_argument("directory", help="Directory to scan (recursively) for PDFs")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help=f"JSONL output and resume checkpoint (default: {DEFAULT_OUTPUT_PATH})")
+    parser.add_argument("--workers", type=int, help="Extraction/OCR processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=16, help="Prepared documents waiting for the LLM stage (default: 16)")
+    parser.add_argument("--llm-documents", type=int, default=4, help="Documents in the LLM stage at once (default: 4)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the extraction cache")
+    parser.add_argument("--retry-errors", action="store_true", help="Also redo documents recorded with an error")
+    parser.add_argument("--fake-llm", action="store_true", help="Use the offline FakeBackend instead of Groq (dry run)")
+    args = parser.parse_args()
+
+    if args.fake_llm:
+        from llm_backends import FakeBackend
+
+        ocr.llm.backend = FakeBackend()
+
+    ingest(
+        args.directory,
+        output_path=args.output,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        llm_documents=args.llm_documents,
+        use_cache=not args.no_cache,
+        retry_errors=args.retry_errors,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Cohort-level cardio age and risk flags: scalar loops vs NumPy over an upsampled heart1.csv."""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import common  # noqa: F401  (sets up sys.path / cwd)
+
+from prediction_model import (
+    FLAG_CHOLESTEROL,
+    FLAG_MAX_HR,
+    FLAG_OLDPEAK,
+    FLAG_RESTING_BP,
+    calculate_cardiovascular_age,
+    calculate_cardiovascular_age_batch,
+    check_risk_factors,
+    risk_factor_mask,
+)
+
+FLAG_BITS = {
+    "RestingBP": FLAG_RESTING_BP,
+    "Cholesterol": FLAG_CHOLESTEROL,
+    "MaxHR": FLAG_MAX_HR,
+    "Oldpeak": FLAG_OLDPEAK,
+}
+
+
+def upsampled_cohort(rows, seed=0):
+    """Resample heart1.csv to `rows` rows, using the app's Yes/No angina labels."""
+    df = pd.read_csv("heart1.csv")
+    df = df.sample(n=rows, replace=True, random_state=seed).reset_index(drop=True)
+    df["ExerciseAngina"] = df["ExerciseAngina"].map({"Y": "Yes", "N": "No"})
+    return df
+
+
+def vectorized(df):
+    ages = calculate_cardiovascular_age_batch(
+        df["Age"].to_numpy(),
+        df["RestingBP"].to_numpy(),
+        df["Cholesterol"].to_numpy(),
+        df["MaxHR"].to_numpy(),
+        df["Oldpeak"].to_numpy(),
+        df["ExerciseAngina"].to_numpy(),
+        df["FastingBS"].to_numpy(),
+    )
+    masks = risk_factor_mask(
+        df["RestingBP"].to_numpy(),
+        df["Cholesterol"].to_numpy(),
+        df["MaxHR"].to_numpy(),
+        df["Oldpeak"].to_numpy(),
+    )
+    return ages, masks
+
+
+def scalar(records):
+    ages = [calculate_cardiovascular_age(p) for p in records]
+    masks = [
+        sum(FLAG_BITS[flag.split(":")[0]] for flag in check_risk_factors(p)) for p in records
+    ]
+    return ages, masks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Cohort size (default: 1,000,000)")
+    parser.add_argument(
+        "--scalar-rows", type=int, default=100_000,
+        help="Rows run through the scalar functions for timing and the equality check",
+    )
+    args = parser.parse_args()
+
+    df = upsampled_cohort(args.rows)
+
+    start = time.perf_counter()
+    ages, masks = vectorized(df)
+    vec_seconds = time.perf_counter() - start
+
+    records = df.head(args.scalar_rows).to_dict("records")
+    start = time.perf_counter()
+    scalar_ages, scalar_masks = scalar(records)
+    scalar_seconds = time.perf_counter() - start
+
+    n = len(records)
+    if not (np.array_equal(ages[:n], scalar_ages) and np.array_equal(masks[:n], scalar_masks)):
+        raise SystemExit("Vectorized results differ from the scalar functions")
+
+    print(f"vectorized: {args.rows:,} rows in {vec_seconds:.3f}s ({args.rows / vec_seconds:,.0f} rows/s)")
+    print(f"scalar:     {n:,} rows in {scalar_seconds:.3f}s ({n / scalar_seconds:,.0f} rows/s)")
+    speedup = (args.rows / vec_seconds) / (n / scalar_seconds)
+    print(f"speed-up:   {speedup:.0f}x, results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""End-to-end extract_medical_data over a generated corpus, offline, with per-stage timing.
+
+The LLM is replaced by llm_backends.FakeBackend (injectable latency, errors
+and 429s) behind the same LLMClient limits the app uses, so the numbers show
+where a document's time goes: reading, page extraction/OCR, rules, page
+filtering and the LLM stage. Each document randomly omits some report lines,
+so a share of them needs the LLM. Scanned documents need the tesseract and
+poppler binaries on PATH.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from common import SAMPLE_REPORT_LINES, write_scanned_pdf, write_text_pdf
+
+import ocr
+from llm_backends import FakeBackend
+from llm_client import LLMClient
+
+STAGES = ["read", "cache", "extract", "rules", "filter", "llm"]
+
+# What the fake model "reads" for fields the page does not state
+FAKE_DEFAULTS = {
+    "Age": 54, "Sex": "Male", "ChestPainType": "ATA", "RestingBP": 142, "Cholesterol": 238,
+    "FastingBS": 126, "RestingECG": "Normal", "MaxHR": 138, "ExerciseAngina": "No",
+    "Oldpeak": 1.4, "ST_Slope": "Flat",
+}
+
+
+def report_lines(rng, drop_rate):
+    """The sample report with each field line dropped with probability drop_rate."""
+    header, fields = SAMPLE_REPORT_LINES[0], SAMPLE_REPORT_LINES[1:]
+    return [header] + [line for line in fields if rng.random() >= drop_rate]
+
+
+def build_corpus(directory, text_docs, scanned_docs, drop_rate, seed):
+    """Write the corpus and return [(kind, path)]."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(text_docs):
+        lines = report_lines(rng, drop_rate)
+        half = len(lines) // 2
+        pages = [
+            ["CITY DIAGNOSTICS LABORATORY", "Patient report", "Thank you for choosing us", "Page 1 of 4"],
+            lines[:half] + ["Page 2 of 4"],
+            ["CITY DIAGNOSTICS LABORATORY"] + lines[half:] + ["Page 3 of 4"],
+            ["CITY DIAGNOSTICS LABORATORY", "Results are for clinical reference only.", "Page 4 of 4"],
+        ]
+        corpus.append(("text", write_text_pdf(os.path.join(directory, f"text_{i}.pdf"), pages)))
+    for i in range(scanned_docs):
+        path = os.path.join(directory, f"scan_{i}.pdf")
+        corpus.append(("scanned", write_scanned_pdf(path, 2, report_lines(rng, drop_rate))))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--text", type=int, default=20, help="Text-layer documents (default: 20)")
+    parser.add_argument("--scanned", type=int, default=5, help="Scanned documents needing OCR (default: 5)")
+    parser.add_argument("--drop-rate", type=float, default=0.15, help="Chance each field line is left out (default: 0.15)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM latency in seconds (default: 0.5)")
+    parser.add_argument("--jitter", type=float, default=0.25, help="Fake LLM latency jitter in seconds (default: 0.25)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake calls failing with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of fake calls failing with 429")
+    parser.add_argument("--rpm", type=int, default=30, help="Requests per minute allowed (default: 30, as in ocr.py)")
+    parser.add_argument("--tpm", type=int, default=6000, help="Tokens per minute allowed (default: 6000, as in ocr.py)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the corpus and the fake backend")
+    args = parser.parse_args()
+
+    backend = FakeBackend(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=1.0, seed=args.seed, defaults=FAKE_DEFAULTS,
+    )
+    ocr.llm = LLMClient(
+        backend, ocr.MODEL, requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+        hedge_percentile=95, hedge_budget=0.1,
+    )
+
+    results = {"text": [], "scanned": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(tmp, args.text, args.scanned, args.drop_rate, args.seed)
+        start = time.perf_counter()
+        for kind, path in corpus:
+            timings = {}
+            doc_start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # ocr prints per-document progress
+                fields = ocr.extract_medical_data(path, use_cache=False, timings=timings)
+            timings["total"] = time.perf_counter() - doc_start
+            timings["fields"] = len(fields)
+            results[kind].append(timings)
+        wall = time.perf_counter() - start
+
+    print(f"{len(corpus)} documents in {wall:.2f}s (fake LLM {args.latency}s +/- {args.jitter}s, {args.rpm} rpm)")
+    print(f"{'kind':<8} {'docs':>5} {'no LLM':>7} {'fields':>7} {'total ms':>9} {'p95 ms':>8} "
+          + " ".join(f"{stage + ' ms':>10}" for stage in STAGES))
+    for kind, docs in results.items():
+        if not docs:
+            continue
+        totals = np.array([doc["total"] for doc in docs])
+        local = sum(doc["llm_pages"] == 0 for doc in docs)
+        stages = " ".join(f"{np.mean([doc.get(stage, 0.0) for doc in docs]) * 1e3:>10.1f}" for stage in STAGES)
+        print(
+            f"{kind:<8} {len(docs):>5} {local:>7} {np.mean([doc['fields'] for doc in docs]):>7.1f} "
+            f"{totals.mean() * 1e3:>9.1f} {np.percentile(totals, 95) * 1e3:>8.1f} {stages}"
+        )
+
+    metrics = ocr.llm.get_metrics()
+    print(
+        f"LLM: {metrics['calls']} calls, {metrics['attempts']} attempts, {metrics['retries']} retries, "
+        f"{metrics['rate_limited']} rate limited, {metrics['hedges']} hedges, {metrics['failures']} failures, "
+        f"{metrics['rate_limit_wait_seconds']:.1f}s waiting on limits; "
+        f"page p50/p95/p99 {metrics['page_latency_p50_ms']:.0f}/{metrics['page_latency_p95_ms']:.0f}/"
+        f"{metrics['page_latency_p99_ms']:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Concurrent single-patient requests: direct predict vs the shared micro-batcher."""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import common  # noqa: F401  (sets up sys.path / cwd)
+
+from micro_batcher import MicroBatcher
+from prediction_model import patients, predict_heart_disease, warm_up_model
+
+
+def hammer(predict, threads, requests_per_thread):
+    """Run predict from many threads at once and return requests per second."""
+    def worker(i):
+        for j in range(requests_per_thread):
+            predict(patients[(i + j) % len(patients)])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(worker, range(threads)))
+    return threads * requests_per_thread / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32, help="Concurrent callers (default: 32)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per caller (default: 200)")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    warm_up_model()
+    # Bypass the prediction cache: the few sample patients would otherwise all be cache hits
+    direct = hammer(lambda patient: predict_heart_disease(patient, use_cache=False), args.threads, args.requests)
+
+    batcher = MicroBatcher(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    batched = hammer(batcher.predict, args.threads, args.requests)
+    batcher.close()
+
+    print(f"direct:  {direct:,.0f} req/s")
+    print(f"batched: {batched:,.0f} req/s")
+    print(json.dumps(batcher.get_metrics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
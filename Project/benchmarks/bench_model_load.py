@@ -0,0 +1,67 @@
+"""Model load time and resident memory: joblib pickle vs native UBJSON/JSON.
+
+Each load runs in a fresh interpreter so earlier loads cannot warm caches;
+xgboost is imported before the clock starts so only the load itself is timed.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from common import PROJECT_DIR
+
+from prediction_model import DEFAULT_MODEL_PATH, PICKLED_MODEL_PATH, export_native_model
+
+CHILD = """
+import json, resource, sys, time
+import xgboost
+from prediction_model import _rss_bytes, _read_model
+rss_before = _rss_bytes()
+start = time.perf_counter()
+_read_model(sys.argv[1], nthread=int(sys.argv[2]) or None)
+seconds = time.perf_counter() - start
+print(json.dumps({
+    "seconds": seconds,
+    "rss_delta_bytes": _rss_bytes() - rss_before,
+    "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+}))
+"""
+
+
+def measure(model_path, nthread, repeat):
+    """Load model_path `repeat` times in fresh processes and return the median of each metric."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, model_path, str(nthread)],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout))
+    return {key: float(np.median([run[key] for run in runs])) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh-process loads per format (default: 5)")
+    parser.add_argument("--nthread", type=int, default=0, help="Booster nthread (0 = XGBoost default)")
+    args = parser.parse_args()
+
+    # Export the JSON variant outside the project so no tracked file is touched
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, os.path.splitext(os.path.basename(DEFAULT_MODEL_PATH))[0] + ".json")
+        export_native_model(PICKLED_MODEL_PATH, json_path)
+        print(f"{'format':<8} {'file KB':>8} {'load ms':>9} {'RSS delta MB':>13} {'max RSS MB':>11}")
+        for name, path in (("pickle", PICKLED_MODEL_PATH), ("ubj", DEFAULT_MODEL_PATH), ("json", json_path)):
+            stats = measure(path, args.nthread, args.repeat)
+            print(
+                f"{name:<8} {os.path.getsize(path) / 1024:>8.0f} {stats['seconds'] * 1e3:>9.1f} "
+                f"{stats['rss_delta_bytes'] / 2**20:>13.1f} {stats['max_rss_bytes'] / 2**20:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
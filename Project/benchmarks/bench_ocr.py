@@ -0,0 +1,39 @@
+"""OCR wall time vs worker count on a generated multi-page scanned PDF.
+
+Needs the tesseract and poppler binaries on PATH, like the app itself.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import write_scanned_pdf
+
+import ocr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20, help="Pages in the scanned PDF (default: 20)")
+    parser.add_argument("--workers", type=int, nargs="*", help="Worker counts to try (default: 1, 2, 4, ... up to the CPU count)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({1, cpus} | {2 ** i for i in range(1, cpus.bit_length()) if 2 ** i < cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = write_scanned_pdf(os.path.join(tmp, "scan.pdf"), args.pages)
+        baseline = None
+        print(f"{args.pages}-page scan, {cpus} CPUs")
+        print(f"{'workers':>8} {'seconds':>9} {'s/page':>8} {'speed-up':>9}")
+        for n in workers:
+            start = time.perf_counter()
+            texts = ocr.extract_text_ocr(pdf_path, workers=n)
+            seconds = time.perf_counter() - start
+            assert len(texts) == args.pages
+            baseline = baseline or seconds
+            print(f"{n:>8} {seconds:>9.2f} {seconds / args.pages:>8.3f} {baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
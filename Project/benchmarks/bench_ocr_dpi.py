@@ -0,0 +1,56 @@
+"""OCR time and accuracy per page: fixed DPI vs adaptive DPI (low first, re-render on low confidence).
+
+Runs on a clean and a faint generated scan. Accuracy is the number of the
+eleven report fields rule_extractor recovers from each page's OCR text.
+Needs the tesseract and poppler binaries on PATH.
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from common import write_scanned_pdf
+
+import ocr
+from rule_extractor import TARGET_FIELDS, extract_fields
+
+
+def run(pdf_path, pages, adaptive, workers):
+    times, fields, escalated, dpis = [], [], 0, []
+    for _, text, seconds, info in ocr.iter_ocr_pages(pdf_path, range(1, pages + 1), workers, adaptive=adaptive):
+        times.append(seconds)
+        fields.append(len(extract_fields(text)))
+        escalated += len(info["dpi_attempts"]) > 1
+        dpis.append(info["dpi"])
+    return {
+        "s_per_page": float(np.mean(times)),
+        "fields": float(np.mean(fields)),
+        "escalated": escalated,
+        "mean_dpi": float(np.mean(dpis)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10, help="Pages per scan (default: 10)")
+    parser.add_argument("--workers", type=int, default=1, help="OCR worker processes (default: 1)")
+    parser.add_argument("--faint-ink", type=int, default=170, help="Gray level of the faint scan's text (default: 170)")
+    args = parser.parse_args()
+
+    print(f"fixed = {ocr.RENDER_DPI} dpi; adaptive = {ocr.OCR_FAST_DPI} dpi, "
+          f"{ocr.OCR_FINE_DPI} dpi below confidence {ocr.OCR_MIN_CONFIDENCE}")
+    print(f"{'scan':<6} {'mode':<9} {'s/page':>7} {'fields':>9} {'escalated':>10} {'mean dpi':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, ink in (("clean", 0), ("faint", args.faint_ink)):
+            pdf_path = write_scanned_pdf(os.path.join(tmp, f"{name}.pdf"), args.pages, ink=ink)
+            for mode, adaptive in (("fixed", False), ("adaptive", True)):
+                r = run(pdf_path, args.pages, adaptive, args.workers)
+                print(
+                    f"{name:<6} {mode:<9} {r['s_per_page']:>7.2f} {r['fields']:>5.1f}/{len(TARGET_FIELDS):<3} "
+                    f"{r['escalated']:>10} {r['mean_dpi']:>9.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
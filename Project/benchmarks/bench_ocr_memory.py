@@ -0,0 +1,69 @@
+"""Peak memory of OCR on 1/10/100-page scans: render-everything-first vs streaming pages.
+
+Each measurement runs in a fresh interpreter with one worker, so peak RSS
+covers rendering + OCR in that process; poppler/tesseract child processes are
+reported separately. Needs the tesseract and poppler binaries on PATH.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import PROJECT_DIR, write_scanned_pdf
+
+CHILD = """
+import json, resource, sys, time
+import pytesseract
+from pdf2image import convert_from_path
+import ocr
+pdf_path, mode, window = sys.argv[1], sys.argv[2], int(sys.argv[3])
+start = time.perf_counter()
+first_page = None
+if mode == "eager":
+    images = convert_from_path(pdf_path)
+    for image in images:
+        pytesseract.image_to_string(image)
+        first_page = first_page or time.perf_counter() - start
+else:
+    # Fixed DPI (RENDER_DPI, like the eager path) so only the streaming differs
+    for text in ocr.iter_text_ocr(pdf_path, workers=1, window=window, adaptive=False):
+        first_page = first_page or time.perf_counter() - start
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "first_page_seconds": first_page,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+}))
+"""
+
+
+def measure(pdf_path, mode, window):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, pdf_path, mode, str(window)],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="*", default=[1, 10, 100], help="Document sizes (default: 1 10 100)")
+    parser.add_argument("--window", type=int, default=1, help="Pages rendered per poppler call when streaming (default: 1)")
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'mode':<7} {'peak RSS MB':>12} {'child MB':>9} {'first page s':>13} {'total s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = write_scanned_pdf(os.path.join(tmp, f"scan_{pages}.pdf"), pages)
+            for mode in ("eager", "stream"):
+                r = measure(pdf_path, mode, args.window)
+                print(
+                    f"{pages:>6} {mode:<7} {r['peak_rss_mb']:>12.0f} {r['children_peak_rss_mb']:>9.0f} "
+                    f"{r['first_page_seconds']:>13.2f} {r['seconds']:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Per-page render time and peak memory: pdf2image (poppler subprocess) vs pypdfium2 (in-process).
+
+Each backend runs in a fresh interpreter that renders every page of a
+generated scan one at a time, as OCR does, and converts it to what tesseract
+receives. Peak RSS of the interpreter and of poppler child processes is
+reported separately. pdf2image needs the poppler binaries on PATH.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import PROJECT_DIR, write_scanned_pdf
+
+CHILD = """
+import json, resource, sys, time
+import numpy as np
+import ocr
+pdf_path, backend, dpi, grayscale, pages = sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4] == "1", int(sys.argv[5])
+samples = []
+images = ocr.iter_page_images(pdf_path, range(1, pages + 1), backend=backend, dpi=dpi, grayscale=grayscale)
+start = time.perf_counter()
+for image in images:
+    samples.append(time.perf_counter() - start)
+    ocr._close_image(image)
+    start = time.perf_counter()
+print(json.dumps({
+    "p50_ms": float(np.percentile(samples, 50) * 1e3),
+    "mean_ms": float(np.mean(samples) * 1e3),
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+}))
+"""
+
+
+def measure(pdf_path, backend, dpi, grayscale, pages):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, pdf_path, backend, str(dpi), "1" if grayscale else "0", str(pages)],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10, help="Pages in the scanned PDF (default: 10)")
+    parser.add_argument("--dpi", type=int, nargs="*", default=[150, 200, 300], help="Render resolutions (default: 150 200 300)")
+    parser.add_argument("--backends", nargs="*", default=["pdf2image", "pypdfium2"], help="Backends to compare")
+    args = parser.parse_args()
+
+    print(f"{args.pages}-page scan")
+    print(f"{'backend':<10} {'dpi':>4} {'gray':>5} {'p50 ms':>8} {'mean ms':>8} {'peak RSS MB':>12} {'child MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = write_scanned_pdf(os.path.join(tmp, "scan.pdf"), args.pages)
+        for dpi in args.dpi:
+            for grayscale in (False, True):
+                for backend in args.backends:
+                    r = measure(pdf_path, backend, dpi, grayscale, args.pages)
+                    print(
+                        f"{backend:<10} {dpi:>4} {'yes' if grayscale else 'no':>5} {r['p50_ms']:>8.1f} "
+                        f"{r['mean_ms']:>8.1f} {r['peak_rss_mb']:>12.0f} {r['children_peak_rss_mb']:>9.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
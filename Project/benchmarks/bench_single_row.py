@@ -0,0 +1,53 @@
+"""Single-patient latency: pandas get_dummies path vs the NumPy fast path (uncached and cached)."""
+import argparse
+
+from common import summarize, time_calls
+
+from prediction_model import (
+    DEFAULT_MODEL_PATH,
+    get_features,
+    load_model,
+    patients,
+    predict_heart_disease,
+    warm_up_model,
+)
+
+
+def predict_legacy(patient, model_path=DEFAULT_MODEL_PATH):
+    """The original DataFrame-based encoding, kept here for comparison."""
+    import pandas as pd
+
+    model = load_model(model_path)
+    x = pd.DataFrame([patient])
+    x = pd.get_dummies(x)
+    for col in get_features():
+        if col not in x.columns:
+            x[col] = 0
+    x = x[get_features()]
+    return model.predict_proba(x)[:, 1][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per patient (default: 2000)")
+    args = parser.parse_args()
+
+    warm_up_model()
+    print(f"{'patient':<8} {'path':<8} {'p50 us':>10} {'p99 us':>10} {'prob':>8}")
+    for i, patient in enumerate(patients, 1):
+        legacy_prob = predict_legacy(patient)
+        fast_prob = predict_heart_disease(patient, use_cache=False)[1]
+        if abs(legacy_prob - fast_prob) > 1e-6:
+            raise SystemExit(f"Patient {i}: fast path prob {fast_prob} != legacy {legacy_prob}")
+
+        for name, fn, prob in (
+            ("legacy", lambda: predict_legacy(patient), legacy_prob),
+            ("fast", lambda: predict_heart_disease(patient, use_cache=False), fast_prob),
+            ("cached", lambda: predict_heart_disease(patient), fast_prob),
+        ):
+            stats = summarize(time_calls(fn, args.repeat))
+            print(f"{i:<8} {name:<8} {stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f} {prob:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Shared helpers for the scripts in benchmarks/.
+
+Benchmarks are run from anywhere (e.g. `python benchmarks/bench_single_row.py`);
+importing this module puts the project on sys.path and switches to the project
+directory so the model and data files resolve the same way the app does.
+"""
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+os.chdir(PROJECT_DIR)
+
+# PIL-written PDFs have no CropBox; pdfminer warns about it on every page
+logging.getLogger("pdfminer").setLevel(logging.ERROR)
+
+
+def time_calls(fn, repeat, warmup=10):
+    """Call fn() repeat times after a warm-up and return per-call latencies in seconds."""
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return samples
+
+
+def summarize(samples):
+    """Return p50/p99/mean of a latency sample in microseconds."""
+    return {
+        "p50_us": float(np.percentile(samples, 50) * 1e6),
+        "p99_us": float(np.percentile(samples, 99) * 1e6),
+        "mean_us": float(np.mean(samples) * 1e6),
+    }
+
+
+# A plausible lab printout used to generate benchmark PDFs
+SAMPLE_REPORT_LINES = [
+    "CITY DIAGNOSTICS LABORATORY",
+    "Patient: John Doe        Age: 54 Years        Sex: Male",
+    "Resting Blood Pressure: 142/90 mmHg",
+    "Total Cholesterol: 238 mg/dL",
+    "Fasting Blood Sugar: 126 mg/dL",
+    "Resting ECG: Normal",
+    "Maximum Heart Rate Achieved: 138 bpm",
+    "Exercise Induced Angina: No",
+    "ST Depression (Oldpeak): 1.4",
+    "ST Slope: Flat",
+    "Chest Pain Type: Atypical Angina",
+]
+
+
+def write_scanned_pdf(path, pages, lines=SAMPLE_REPORT_LINES, dpi=150, ink=0):
+    """
+    Write a `pages`-page image-only PDF (no text layer) that needs OCR.
+    ink is the text's gray level (0 black .. 255 white); raise it for faint scans.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height = int(8.27 * dpi), int(11.69 * dpi)  # A4
+    font = ImageFont.load_default(size=dpi // 5)
+    images = []
+    for page in range(pages):
+        image = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(lines + [f"Page {page + 1} of {pages}"]):
+            draw.text((dpi // 2, dpi // 2 + i * dpi // 3), line, fill=ink, font=font)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=dpi)
+    return path
+
+
+def write_text_pdf(path, pages):
+    """Write a PDF with a real text layer (Helvetica); `pages` is a list of line lists."""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(pages):
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+        stream = "BT /F1 11 Tf 50 800 Td 14 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
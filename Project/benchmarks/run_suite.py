@@ -0,0 +1,147 @@
+"""Run every prediction/scoring benchmark and write machine-readable JSON.
+
+Usage:
+    python benchmarks/run_suite.py --output bench.json
+    python benchmarks/run_suite.py --output new.json --compare bench.json
+
+Everything runs offline against the bundled model and heart1.csv. Compare two
+result files to spot regressions between commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+import numpy as np
+
+from common import PROJECT_DIR, summarize, time_calls
+
+from bench_cohort import upsampled_cohort
+from bench_model_load import measure
+from prediction_model import (
+    DEFAULT_MODEL_PATH,
+    PICKLED_MODEL_PATH,
+    calculate_cardiovascular_age,
+    check_risk_factors,
+    patients,
+    predict_heart_disease,
+    predict_heart_disease_batch,
+    warm_up_model,
+)
+from tips import generate_health_tips
+
+BATCH_SIZES = [1, 100, 10_000, 1_000_000]
+
+
+def environment():
+    """Describe the machine and code version the results came from."""
+    import xgboost
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "xgboost": xgboost.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def bench_model_load(repeat):
+    return {
+        name: measure(path, 0, repeat)
+        for name, path in (("pickle", PICKLED_MODEL_PATH), ("native", DEFAULT_MODEL_PATH))
+    }
+
+
+def bench_single_row(repeat):
+    results = {}
+    for name, use_cache in (("uncached", False), ("cached", True)):
+        samples = np.concatenate([
+            time_calls(lambda: predict_heart_disease(p, use_cache=use_cache), repeat)
+            for p in patients
+        ])
+        results[name] = summarize(samples)
+    return results
+
+
+def bench_batch(sizes, repeat):
+    cohort = upsampled_cohort(max(sizes))
+    results = {}
+    for size in sizes:
+        data = cohort.head(size)
+        runs = max(1, repeat // size) if size < 10_000 else 1
+        warmup = 1 if size <= 10_000 else 0
+        seconds = float(np.median(time_calls(lambda: predict_heart_disease_batch(data), runs, warmup)))
+        results[str(size)] = {"seconds": seconds, "rows_per_second": size / seconds}
+    return results
+
+
+def bench_scalar(fn, repeat):
+    return summarize(np.concatenate([time_calls(lambda: fn(p), repeat) for p in patients]))
+
+
+def compare(current, baseline_path):
+    """Print p50/seconds ratios of current vs a baseline result file (>1 means slower)."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def walk(cur, base, path):
+        for key, value in cur.items():
+            if key not in base:
+                continue
+            if isinstance(value, dict):
+                walk(value, base[key], path + [key])
+            elif key in ("p50_us", "seconds") and base[key]:
+                ratio = value / base[key]
+                marker = "  <-- slower" if ratio > 1.1 else ""
+                print(f"{'.'.join(path + [key]):<45} {ratio:6.2f}x{marker}")
+
+    print(f"vs {baseline_path} (commit {baseline['environment'].get('commit')}):")
+    walk(current["results"], baseline["results"], [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write results JSON here (default: print to stdout)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--repeat", type=int, default=1000, help="Calls per micro-benchmark (default: 1000)")
+    parser.add_argument("--load-repeat", type=int, default=5, help="Fresh-process model loads (default: 5)")
+    parser.add_argument("--quick", action="store_true", help="Skip the 1M-row batch")
+    args = parser.parse_args()
+
+    sizes = BATCH_SIZES[:-1] if args.quick else BATCH_SIZES
+    warm_up_model()
+    results = {
+        "model_load": bench_model_load(args.load_repeat),
+        "predict_single": bench_single_row(args.repeat),
+        "predict_batch": bench_batch(sizes, args.repeat),
+        "calculate_cardiovascular_age": bench_scalar(calculate_cardiovascular_age, args.repeat),
+        "check_risk_factors": bench_scalar(check_risk_factors, args.repeat),
+        "generate_health_tips": bench_scalar(generate_health_tips, args.repeat),
+    }
+    report = {"environment": environment(), "results": results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
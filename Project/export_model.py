@@ -0,0 +1,24 @@
+import argparse
+import os
+
+from prediction_model import DEFAULT_MODEL_PATH, PICKLED_MODEL_PATH, export_native_model
+
+
+def main():
+    """CLI interface for converting the pickled model to XGBoost's native format."""
+    parser = argparse.ArgumentParser(
+        description="Export the pickled XGBoost model to native UBJSON/JSON plus its feature schema."
+    )
+    parser.add_argument("--input", default=PICKLED_MODEL_PATH, help="Pickled model (default: heart_disease_xgb_model.pkl)")
+    parser.add_argument(
+        "--output", default=DEFAULT_MODEL_PATH,
+        help="Native model file; .ubj for UBJSON or .json for JSON (default: heart_disease_xgb_model.ubj)",
+    )
+    args = parser.parse_args()
+
+    path = export_native_model(args.input, args.output)
+    print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_CACHE_PATH = "extraction_cache.sqlite3"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+
+def pdf_digest(pdf_bytes):
+    """SHA-256 of the PDF bytes: the content address used as the cache key."""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk (SQLite) cache of PDF extraction results, keyed by content.
+
+    Two tables are kept:
+      - pages:   per-page extracted text, keyed by the PDF's SHA-256 only, so a
+                 prompt or model change can reuse it and skip OCR;
+      - results: the final JSON, keyed by SHA-256 + prompt/model version.
+    When the stored payloads exceed max_bytes, the least recently used entries
+    (across both tables) are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"result_hits": 0, "page_hits": 0, "misses": 0, "evictions": 0}
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    pdf_sha256 TEXT PRIMARY KEY,
+                    pages_json TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    pdf_sha256 TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    result_json TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (pdf_sha256, prompt_version)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across Streamlit threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_result(self, digest, prompt_version):
+        """Return the cached final JSON for this PDF and prompt version, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result_json FROM results WHERE pdf_sha256 = ? AND prompt_version = ?",
+                (digest, prompt_version),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE results SET last_used = ? WHERE pdf_sha256 = ? AND prompt_version = ?",
+                (time.time(), digest, prompt_version),
+            )
+        self._count("result_hits")
+        return json.loads(row[0])
+
+    def get_pages(self, digest):
+        """Return the cached per-page extraction for this PDF, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT pages_json FROM pages WHERE pdf_sha256 = ?", (digest,)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute(
+                "UPDATE pages SET last_used = ? WHERE pdf_sha256 = ?", (time.time(), digest)
+            )
+        self._count("page_hits")
+        return json.loads(row[0])
+
+    def put_pages(self, digest, pages):
+        payload = json.dumps(pages)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                (digest, payload, len(payload), time.time()),
+            )
+            self._evict(conn)
+
+    def put_result(self, digest, prompt_version, result):
+        payload = json.dumps(result)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (digest, prompt_version, payload, len(payload), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Delete least recently used entries until the payloads fit in max_bytes."""
+        total = conn.execute(
+            "SELECT COALESCE((SELECT SUM(size) FROM pages), 0) + COALESCE((SELECT SUM(size) FROM results), 0)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        entries = conn.execute("""
+            SELECT 'pages', pdf_sha256, NULL, size, last_used FROM pages
+            UNION ALL
+            SELECT 'results', pdf_sha256, prompt_version, size, last_used FROM results
+            ORDER BY last_used
+        """).fetchall()
+        for table, digest, prompt_version, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if table == "pages":
+                conn.execute("DELETE FROM pages WHERE pdf_sha256 = ?", (digest,))
+            else:
+                conn.execute(
+                    "DELETE FROM results WHERE pdf_sha256 = ? AND prompt_version = ?",
+                    (digest, prompt_version),
+                )
+            total -= size
+            self._count("evictions")
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM pages")
+            conn.execute("DELETE FROM results")
+
+    def get_stats(self):
+        """Return hit/miss/eviction counters plus the current entry counts and size."""
+        with self._connect() as conn:
+            pages, page_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+            results, result_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(pages=pages, results=results, bytes=page_bytes + result_bytes, max_bytes=self.max_bytes)
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """Return the process-wide ExtractionCache, opening it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+        return _cache
@@ -0,0 +1,187 @@
+import argparse
+import json
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_SCHEMA_PATH = "heart_disease_schema.json"
+TRAINING_CSV_PATH = "heart1.csv"
+TARGET_COLUMN = "HeartDisease"
+
+# Columns one-hot encoded with pd.get_dummies at training time
+CATEGORY_COLS = [
+    "Sex",
+    "ChestPainType",
+    "RestingECG",
+    "ExerciseAngina",
+    "ST_Slope",
+    "FastingBS",
+]
+
+
+def build_schema(csv_path=TRAINING_CSV_PATH):
+    """Derive the training feature layout (column order, vocabularies, dtypes) from the CSV."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    df.drop([TARGET_COLUMN], axis=1, inplace=True)
+    encoded = pd.get_dummies(df, columns=CATEGORY_COLS)
+    features = encoded.columns.tolist()
+
+    # get_dummies names each column "<col>_<value>" with values in sorted order
+    categories = {
+        col: [f[len(col) + 1:] for f in features if f.startswith(col + "_")]
+        for col in CATEGORY_COLS
+    }
+    return {
+        "target": TARGET_COLUMN,
+        "raw_columns": df.columns.tolist(),
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "numeric_columns": [col for col in df.columns if col not in CATEGORY_COLS],
+        "categories": categories,
+        "features": features,
+    }
+
+
+def save_schema(schema, schema_path=DEFAULT_SCHEMA_PATH):
+    """Write the schema as JSON next to the model."""
+    with open(schema_path, "w") as f:
+        json.dump(schema, f, indent=2)
+
+
+@lru_cache(maxsize=None)
+def load_schema(schema_path=DEFAULT_SCHEMA_PATH):
+    """Load (once per process) the schema saved by save_schema."""
+    with open(schema_path) as f:
+        return json.load(f)
+
+
+def check_schema(schema, booster):
+    """Raise ValueError if the schema's feature order differs from the booster's."""
+    booster_features = booster.feature_names
+    if booster_features is None:
+        return
+    if list(booster_features) != schema["features"]:
+        missing = sorted(set(booster_features) - set(schema["features"]))
+        extra = sorted(set(schema["features"]) - set(booster_features))
+        raise ValueError(
+            "Feature schema does not match the model "
+            f"(missing: {missing}, unexpected: {extra}, or the order differs). "
+            "Regenerate it with `python feature_schema.py`."
+        )
+
+
+@lru_cache(maxsize=None)
+def get_index_tables(schema_path=DEFAULT_SCHEMA_PATH):
+    """Return (numeric, categorical) tables mapping raw columns to feature-vector positions."""
+    schema = load_schema(schema_path)
+    position = {feature: i for i, feature in enumerate(schema["features"])}
+    numeric = tuple((col, position[col]) for col in schema["numeric_columns"])
+    categorical = tuple(
+        (col, {value: position[f"{col}_{value}"] for value in values})
+        for col, values in schema["categories"].items()
+    )
+    return numeric, categorical
+
+
+def encode_patient(patient, out=None, schema_path=DEFAULT_SCHEMA_PATH):
+    """
+    Encode one patient dict into a float32 feature vector without pandas.
+
+    Matches pd.get_dummies + reindex: only string values are one-hot encoded,
+    and values outside the training vocabulary leave their columns at 0.
+    Pass a preallocated `out` vector to avoid allocating per call.
+    """
+    numeric, categorical = get_index_tables(schema_path)
+    if out is None:
+        out = np.zeros(len(load_schema(schema_path)["features"]), dtype=np.float32)
+    else:
+        out.fill(0)
+
+    for col, idx in numeric:
+        out[idx] = patient.get(col, 0)
+    for col, table in categorical:
+        value = patient.get(col)
+        if isinstance(value, str) and value in table:
+            out[table[value]] = 1
+    return out
+
+
+def patient_columns(data, schema_path=DEFAULT_SCHEMA_PATH):
+    """
+    Split a list of patient dicts or a DataFrame into one array per raw column.
+
+    Numeric columns become float64 arrays (missing columns are 0); categorical
+    columns are kept as object arrays so they can be compared with vocabulary strings.
+    """
+    schema = load_schema(schema_path)
+    is_frame = hasattr(data, "columns")
+    n = len(data)
+
+    columns = {}
+    for col in schema["raw_columns"]:
+        if is_frame:
+            values = data[col].to_numpy() if col in data.columns else None
+        else:
+            values = [p.get(col, 0 if col in schema["numeric_columns"] else None) for p in data]
+
+        if col in schema["numeric_columns"]:
+            columns[col] = np.zeros(n) if values is None else np.asarray(values, dtype=np.float64)
+        else:
+            columns[col] = np.full(n, None, dtype=object) if values is None else np.asarray(values, dtype=object)
+    return columns
+
+
+def encode_columns(columns, schema_path=DEFAULT_SCHEMA_PATH):
+    """Encode the per-column arrays from patient_columns into an n x n_features float32 matrix."""
+    numeric, categorical = get_index_tables(schema_path)
+    n = len(next(iter(columns.values())))
+    out = np.zeros((n, len(load_schema(schema_path)["features"])), dtype=np.float32)
+
+    for col, idx in numeric:
+        out[:, idx] = columns[col]
+    for col, table in categorical:
+        values = columns[col]
+        for value, idx in table.items():
+            out[:, idx] = values == value
+    return out
+
+
+def encode_patients(data, schema_path=DEFAULT_SCHEMA_PATH):
+    """
+    Encode many patients in one vectorized pass.
+
+    Accepts a list of patient dicts, a DataFrame with the raw columns, or a
+    NumPy matrix that is already in encoded feature order. Returns the float32
+    feature matrix and a dict of the raw numeric columns.
+    """
+    if isinstance(data, np.ndarray):
+        n_features = len(load_schema(schema_path)["features"])
+        if data.ndim != 2 or data.shape[1] != n_features:
+            raise ValueError(
+                f"Expected an encoded matrix with {n_features} columns, got shape {data.shape}"
+            )
+        x = np.ascontiguousarray(data, dtype=np.float32)
+        numeric, _ = get_index_tables(schema_path)
+        return x, {col: data[:, idx].astype(np.float64) for col, idx in numeric}
+
+    columns = patient_columns(data, schema_path)
+    return encode_columns(columns, schema_path), columns
+
+
+def main():
+    """CLI interface for regenerating the schema from the training CSV."""
+    parser = argparse.ArgumentParser(
+        description="Build the model feature schema from the training CSV."
+    )
+    parser.add_argument("--csv", default=TRAINING_CSV_PATH, help="Training CSV (default: heart1.csv)")
+    parser.add_argument("--output", default=DEFAULT_SCHEMA_PATH, help="Schema JSON to write")
+    args = parser.parse_args()
+
+    schema = build_schema(args.csv)
+    save_schema(schema, args.output)
+    print(f"Wrote {len(schema['features'])} features to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Extractions run at once across all sessions; further jobs wait in the queue
+MAX_CONCURRENT_JOBS = 2
+# Finished jobs are forgotten after this long if nobody collects them
+KEEP_FINISHED_SECONDS = 3600
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function once its job has been cancelled."""
+
+
+class Job:
+    """
+    One background task and its observable state.
+
+    status moves from "queued" to "running" and ends as "done", "failed" or
+    "cancelled". The job function reports through update() and should call
+    raise_if_cancelled() at convenient points; cancellation is cooperative
+    once a job is running, and on_cancel() callbacks can interrupt a wait.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+        self._cancel_callbacks = []
+        self._future = None
+        self._lock = threading.Lock()
+
+    def update(self, progress=None, message=None):
+        with self._lock:
+            if progress is not None:
+                self.progress = progress
+            if message is not None:
+                self.message = message
+
+    def cancel(self):
+        """Ask the job to stop; a job still in the queue never starts."""
+        with self._lock:
+            self._cancel.set()
+            callbacks, self._cancel_callbacks = self._cancel_callbacks, []
+        for callback in callbacks:
+            callback()
+        if self._future is not None and self._future.cancel():
+            self._finish("cancelled")
+
+    def on_cancel(self, callback):
+        """Call callback() from the cancelling thread once the job is cancelled (now, if it already is)."""
+        with self._lock:
+            if not self._cancel.is_set():
+                self._cancel_callbacks.append(callback)
+                return
+        callback()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def raise_if_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def _finish(self, status, result=None, error=None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished = time.time()
+
+    def snapshot(self):
+        """A consistent copy of the job's state, for display."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "progress": self.progress,
+                "message": self.message,
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobRunner:
+    """
+    Process-wide background job runner on a bounded thread pool.
+
+    Streamlit reruns the page script on every interaction; keeping work here
+    (and only the job id in st.session_state) lets a session poll progress,
+    cancel, and pick up the result after any number of reruns.
+    """
+
+    def __init__(self, max_workers=MAX_CONCURRENT_JOBS, keep_seconds=KEEP_FINISHED_SECONDS):
+        self.keep_seconds = keep_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(job, *args, **kwargs); its return value becomes job.result."""
+        job = Job()
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            job._future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        """Return the Job with this id, or None if it is unknown or was pruned."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def forget(self, job_id):
+        """Drop a finished job once its result has been collected."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            job._finish("cancelled")
+            return
+        with job._lock:
+            job.status = "running"
+        try:
+            result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            job._finish("cancelled")
+        except Exception as e:
+            job._finish("failed", error=f"{type(e).__name__}: {e}")
+        else:
+            job._finish("cancelled" if job.cancelled else "done", result=result)
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def get_stats(self):
+        """Count jobs by status."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        stats = {"queued": 0, "running": 0, "done": 0, "failed": 0, "cancelled": 0}
+        for job in jobs:
+            stats[job.status] += 1
+        return stats
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """Return the process-wide JobRunner, starting it on first use."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import random
+
+from rule_extractor import TARGET_FIELDS, extract_fields
+
+# Groq returns 400 when json_object mode produced invalid JSON; a retry usually succeeds
+RETRYABLE_STATUS_CODES = (400, 429, 500, 502, 503, 504)
+
+
+class BackendError(Exception):
+    """
+    A failed completion, independent of the provider.
+
+    status_code is the HTTP status when there was a response (None for
+    connection errors and timeouts); retry_after is the server's hint in seconds.
+    """
+
+    def __init__(self, message, status_code=None, retry_after=None, retryable=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.retryable = status_code in RETRYABLE_STATUS_CODES if retryable is None else retryable
+
+
+class RateLimitedError(BackendError):
+    """HTTP 429 from the provider."""
+
+    def __init__(self, message="rate limited", retry_after=None):
+        super().__init__(message, status_code=429, retry_after=retry_after)
+
+
+class GroqBackend:
+    """
+    Chat completions from Groq.
+
+    The AsyncGroq client is created on first use, reading GROQ_API_KEY from
+    .env when no api_key is given, so importing ocr needs neither the key nor
+    the network. Groq errors are re-raised as BackendError.
+    """
+
+    def __init__(self, api_key=None, env_path=".env"):
+        self.api_key = api_key
+        self.env_path = env_path
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from dotenv import dotenv_values
+            from groq import AsyncGroq
+
+            api_key = self.api_key or dotenv_values(self.env_path).get("GROQ_API_KEY")
+            if not api_key:
+                raise BackendError(f"GROQ_API_KEY is not set in {self.env_path}", retryable=False)
+            self._client = AsyncGroq(api_key=api_key)
+        return self._client
+
+    async def complete(self, messages, model):
+        """Return the reply text of a JSON-mode chat completion."""
+        import groq
+
+        client = self._get_client()
+        try:
+            response = await client.chat.completions.create(
+                messages=messages,
+                model=model,
+                response_format={"type": "json_object"},
+            )
+        except groq.RateLimitError as e:
+            raise RateLimitedError(str(e), retry_after=_retry_after(e)) from e
+        except groq.APIStatusError as e:
+            raise BackendError(str(e), status_code=e.status_code, retry_after=_retry_after(e)) from e
+        except (groq.APIConnectionError, groq.APITimeoutError) as e:
+            raise BackendError(str(e), retryable=True) from e
+        return response.choices[0].message.content
+
+
+def _retry_after(exc):
+    """Seconds from the response's Retry-After header, if there is one."""
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class FakeBackend:
+    """
+    Offline stand-in for GroqBackend, for tests and benchmarks.
+
+    Answers come from reading the last user message with rule_extractor, so
+    they are deterministic and match what the page says. Fields not found
+    are returned as null, like the real model does, or taken from `defaults`.
+    Each call sleeps latency +/- jitter seconds, then fails with
+    probability rate_limit_rate (429, with retry_after) or error_rate (503).
+    seed makes the latency and failures reproducible.
+    """
+
+    def __init__(self, latency=0.5, jitter=0.25, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=None, seed=None, defaults=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.defaults = defaults or {}
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    async def complete(self, messages, model):
+        self.calls += 1
+        delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        roll = self._random.random()
+        await asyncio.sleep(delay)
+        if roll < self.rate_limit_rate:
+            raise RateLimitedError(retry_after=self.retry_after)
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise BackendError("service unavailable", status_code=503)
+
+        found = extract_fields(messages[-1]["content"])
+        return json.dumps({field: found.get(field, self.defaults.get(field)) for field in TARGET_FIELDS})
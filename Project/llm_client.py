@@ -0,0 +1,306 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import weakref
+from collections import deque
+
+import numpy as np
+
+from llm_backends import BackendError
+
+# Rough completion size reserved against the tokens-per-minute budget
+EXPECTED_COMPLETION_TOKENS = 200
+
+
+def estimate_tokens(messages):
+    """Cheap token estimate (~4 characters per token) for rate limiting."""
+    return sum(len(m["content"]) for m in messages) // 4 + EXPECTED_COMPLETION_TOKENS
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `per_minute` units per minute, holding at most one minute's worth.
+
+    Callers reserve capacity up front and are told how long to wait, so one
+    bucket can be shared by every event loop and thread in the process.
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount):
+        """Take `amount` tokens (possibly going into debt) and return the seconds to wait."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, amount):
+        """Give back tokens reserved for a request that was never sent."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    async def acquire(self, amount=1):
+        """
+        Wait until `amount` tokens are available; returns the time spent waiting.
+        A wait that is cancelled refunds its reservation.
+        """
+        wait = self.reserve(amount)
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund(amount)
+                raise
+        return wait
+
+
+class _InFlight:
+    """When the current request of one call was sent; since is None while none is out."""
+
+    def __init__(self):
+        self.since = None
+        self.sent = asyncio.Event()
+
+    def start(self):
+        self.since = time.perf_counter()
+        self.sent.set()
+
+    def stop(self):
+        self.since = None
+        self.sent.clear()
+
+
+def _is_retryable(exc):
+    if isinstance(exc, BackendError):
+        return exc.retryable
+    return isinstance(exc, json.JSONDecodeError)
+
+
+class LLMClient:
+    """
+    Rate-limited, bounded-retry wrapper around an LLM backend for JSON extraction.
+
+    The backend is any object with `async complete(messages, model) -> str`
+    that raises llm_backends.BackendError on failure (see GroqBackend, FakeBackend).
+
+    - at most max_concurrency requests in flight per event loop;
+    - process-wide request and token buckets (requests_per_minute, tokens_per_minute);
+    - exponential backoff with full jitter, honouring Retry-After when present;
+    - at most max_attempts attempts and a page_deadline (seconds) per call;
+    - optional hedging: once hedge_min_samples request latencies are known, a
+      call whose request has been out (sent, not just queued on the limits)
+      for longer than their hedge_percentile gets one duplicate request, the
+      first answer wins and the other is cancelled. Hedges are capped at
+      hedge_budget x calls.
+    """
+
+    def __init__(self, backend, model, max_concurrency=4, requests_per_minute=30,
+                 tokens_per_minute=6000, max_attempts=5, base_delay=1.0, max_delay=30.0,
+                 page_deadline=90.0, hedge_percentile=None, hedge_min_samples=20,
+                 hedge_budget=0.1, latency_window=1000):
+        self.backend = backend
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.page_deadline = page_deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_budget = hedge_budget
+
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "deadline_exceeded": 0,
+            "rate_limit_wait_seconds": 0.0,
+            "backoff_wait_seconds": 0.0,
+            "hedges": 0,
+            "hedges_won": 0,
+            "hedges_over_budget": 0,
+        }
+        # Latency of single API requests (drives hedging) and of whole calls (one per page)
+        self._request_latencies = deque(maxlen=latency_window)
+        self._call_latencies = deque(maxlen=latency_window)
+
+    def _semaphore(self):
+        # asyncio primitives belong to one loop; extract_medical_data runs a new
+        # loop per document, possibly from several Streamlit threads at once
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _add(self, key, value=1):
+        with self._metrics_lock:
+            self._metrics[key] += value
+
+    def _backoff(self, attempt, exc):
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def complete_json(self, messages, hedge=True):
+        """
+        Return the model's JSON reply as a dict; raises once retries or the deadline run out.
+        hedge=False disables hedging for this call.
+        """
+        self._add("calls")
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._hedged(messages, hedge), timeout=self.page_deadline)
+        except asyncio.TimeoutError:
+            self._add("deadline_exceeded")
+            self._add("failures")
+            raise
+        except Exception:
+            self._add("failures")
+            raise
+        with self._metrics_lock:
+            self._call_latencies.append(time.perf_counter() - start)
+        return result
+
+    def _hedge_delay(self):
+        """Seconds to wait before hedging, or None while hedging is off or samples are too few."""
+        if self.hedge_percentile is None:
+            return None
+        with self._metrics_lock:
+            if len(self._request_latencies) < self.hedge_min_samples:
+                return None
+            return float(np.percentile(self._request_latencies, self.hedge_percentile))
+
+    def _take_hedge(self):
+        with self._metrics_lock:
+            if self._metrics["hedges"] + 1 > self.hedge_budget * self._metrics["calls"]:
+                self._metrics["hedges_over_budget"] += 1
+                return False
+            self._metrics["hedges"] += 1
+            return True
+
+    async def _hedged(self, messages, hedge):
+        delay = self._hedge_delay() if hedge else None
+        if delay is None:
+            return await self._attempt(messages)
+        in_flight = _InFlight()
+        primary = asyncio.ensure_future(self._attempt(messages, in_flight))
+        tasks = {primary}
+        try:
+            # The hedge clock only runs while a request is out: time spent on the
+            # rate limits, the semaphore or a retry backoff is not tail latency
+            while True:
+                if in_flight.since is None:
+                    sent = asyncio.ensure_future(in_flight.sent.wait())
+                    await asyncio.wait({primary, sent}, return_when=asyncio.FIRST_COMPLETED)
+                    sent.cancel()
+                    if primary.done():
+                        return primary.result()
+                    continue
+                remaining = in_flight.since + delay - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait({primary}, timeout=remaining)
+                if done:
+                    return primary.result()
+            if not self._take_hedge():
+                return await primary
+
+            tasks.add(asyncio.ensure_future(self._attempt(messages)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._add("hedges_won")
+                        return task.result()
+                    error = task.exception()
+            # Both requests failed
+            raise error
+        finally:
+            # The loser (or both, if the caller was cancelled) must not keep running
+            for task in tasks:
+                task.cancel()
+
+    async def _reserve(self, tokens):
+        """Wait for one request and `tokens` tokens from the buckets; a cancelled wait gives both back."""
+        waited = await self._requests.acquire(1)
+        try:
+            waited += await self._tokens.acquire(tokens)
+        except asyncio.CancelledError:
+            self._requests.refund(1)
+            raise
+        self._add("rate_limit_wait_seconds", waited)
+
+    async def _attempt(self, messages, in_flight=None):
+        tokens = estimate_tokens(messages)
+        for attempt in range(1, self.max_attempts + 1):
+            await self._reserve(tokens)
+            semaphore = self._semaphore()
+            try:
+                await semaphore.acquire()
+            except asyncio.CancelledError:
+                # Cancelled before sending (early stop, hedge loser, deadline): the capacity was never used
+                self._requests.refund(1)
+                self._tokens.refund(tokens)
+                raise
+
+            self._add("attempts")
+            if in_flight is not None:
+                in_flight.start()
+            try:
+                start = time.perf_counter()
+                content = await self.backend.complete(messages, self.model)
+                with self._metrics_lock:
+                    self._request_latencies.append(time.perf_counter() - start)
+                return json.loads(content)
+            except Exception as e:
+                if not _is_retryable(e) or attempt == self.max_attempts:
+                    raise
+                if getattr(e, "status_code", None) == 429:
+                    self._add("rate_limited")
+                delay = self._backoff(attempt, e)
+            finally:
+                if in_flight is not None:
+                    in_flight.stop()
+                semaphore.release()
+
+            self._add("retries")
+            self._add("backoff_wait_seconds", delay)
+            await asyncio.sleep(delay)
+
+    def get_metrics(self):
+        """
+        Return call/attempt/retry/failure/hedge counts, time spent waiting on limits
+        and backoff, and p50/p95/p99 latency (ms) of single requests and of whole calls.
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            latencies = {"request": np.array(self._request_latencies), "page": np.array(self._call_latencies)}
+        for name, samples in latencies.items():
+            for pct in (50, 95, 99):
+                metrics[f"{name}_latency_p{pct}_ms"] = float(np.percentile(samples, pct) * 1e3) if samples.size else 0.0
+        return metrics
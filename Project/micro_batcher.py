@@ -0,0 +1,186 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from feature_schema import encode_patient
+from prediction_model import (
+    DEFAULT_MODEL_PATH,
+    cache_prediction,
+    check_risk_factors,
+    get_cached_prediction,
+    get_features,
+    predict_heart_disease_batch,
+    warm_up_model,
+)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    In-process inference service that coalesces concurrent single-patient requests.
+
+    Streamlit runs each session's script in its own thread, so requests arrive
+    from many threads at once. submit() queues a patient and returns a Future;
+    a single worker thread collects up to max_batch_size queued rows (waiting at
+    most max_wait_ms after the first one) and scores them with one
+    predict_heart_disease_batch call. A request that cannot be encoded fails
+    on its own Future without affecting the rest of its batch.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, max_batch_size=64, max_wait_ms=2.0,
+                 metrics_window=10000):
+        self.model_path = model_path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_waits = deque(maxlen=metrics_window)
+        self._requests = 0
+
+        warm_up_model(model_path)
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, patient):
+        """Queue one patient; the Future resolves to predict_heart_disease's (pred, prob, level, flags)."""
+        future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("cannot submit to a closed MicroBatcher")
+            self._queue.put((patient, future, time.perf_counter()))
+        return future
+
+    def predict(self, patient, timeout=None):
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(patient).result(timeout=timeout)
+
+    def close(self):
+        """Stop the worker after it drains the requests already queued."""
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self, first):
+        """Gather a batch starting with `first` until it is full or max_wait has passed."""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Re-queue so the main loop exits once this batch is served
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = self._collect(item)
+            try:
+                self._serve(batch)
+            except Exception as e:
+                # Never let one bad batch take the worker (and every later request) down
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _serve(self, batch):
+        started = time.perf_counter()
+
+        # Drop requests whose callers cancelled while queued
+        batch = [req for req in batch if req[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        with self._metrics_lock:
+            self._requests += len(batch)
+            self._batch_sizes[len(batch)] += 1
+            self._queue_waits.extend(started - enqueued for _, _, enqueued in batch)
+
+        # Encode and flag each request on its own, so a malformed patient only fails its own Future
+        x = np.zeros((len(batch), len(get_features())), dtype=np.float32)
+        ready = []
+        for patient, future, _ in batch:
+            try:
+                encode_patient(patient, out=x[len(ready)])
+                flags = check_risk_factors(patient)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            ready.append((future, flags))
+        if not ready:
+            return
+
+        try:
+            preds, probs, levels, _ = predict_heart_disease_batch(x[:len(ready)], model_path=self.model_path)
+        except Exception as e:
+            for future, _ in ready:
+                future.set_exception(e)
+            return
+
+        for i, (future, flags) in enumerate(ready):
+            future.set_result((int(preds[i]), float(probs[i]), str(levels[i]), flags))
+
+    def get_metrics(self):
+        """Return request/batch counts, the batch size distribution and queue wait percentiles (ms)."""
+        with self._metrics_lock:
+            waits = np.array(self._queue_waits)
+            sizes = dict(sorted(self._batch_sizes.items()))
+            requests = self._requests
+        batches = sum(sizes.values())
+        metrics = {
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": requests / batches if batches else 0.0,
+            "batch_sizes": sizes,
+            "queue_depth": self._queue.qsize(),
+        }
+        for pct in (50, 95, 99):
+            metrics[f"queue_wait_p{pct}_ms"] = float(np.percentile(waits, pct) * 1e3) if waits.size else 0.0
+        return metrics
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(model_path=DEFAULT_MODEL_PATH):
+    """Return the process-wide MicroBatcher for model_path, starting it on first use."""
+    with _batchers_lock:
+        batcher = _batchers.get(model_path)
+        if batcher is None:
+            batcher = _batchers[model_path] = MicroBatcher(model_path)
+        return batcher
+
+
+def predict_heart_disease_batched(patient, model_path=DEFAULT_MODEL_PATH, timeout=None, use_cache=True):
+    """
+    Drop-in for predict_heart_disease that goes through the shared micro-batcher.
+    With use_cache, the prediction cache is checked before queueing and filled after.
+    """
+    if use_cache:
+        cached = get_cached_prediction(patient, model_path)
+        if cached is not None:
+            return cached
+    result = get_batcher(model_path).predict(patient, timeout=timeout)
+    if use_cache:
+        cache_prediction(patient, *result[:3], model_path=model_path)
+    return result
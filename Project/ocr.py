@@ -1,13 +1,25 @@
 import argparse
 import asyncio
+import contextlib
+import hashlib
+import io
 import json
+import multiprocessing
+import os
 import pdfplumber
+import pypdfium2 as pdfium
 import pytesseract
+import tempfile
+import threading
 import time
-from pdf2image import convert_from_path
-from dotenv import dotenv_values
-from groq import AsyncGroq, RateLimitError, BadRequestError
-from httpx import HTTPStatusError
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pdf2image import convert_from_bytes, convert_from_path
+from extraction_cache import get_extraction_cache, pdf_digest
+from llm_backends import GroqBackend
+from llm_client import LLMClient
+from page_filter import filter_pages
+from rule_extractor import TARGET_FIELDS, extract_fields_from_pages
 
 # Extraction prompt
 PROMPT = """Extract JSON with these keys exactly:
@@ -38,106 +50,580 @@ If none are found, return {}.
 """
 
 
-# Load environment variables
-env_vars = dotenv_values(".env")
-client = AsyncGroq(api_key=env_vars["GROQ_API_KEY"])
+MODEL = "llama3-70b-8192"
+
+# Bump whenever the rule extractor, page filter or the per-page request text
+# change what a document yields, so results cached by older code are not served
+PIPELINE_VERSION = 4
+
+# Cached results are only reused for the same prompt, model and pipeline
+PROMPT_VERSION = hashlib.sha256(f"{MODEL}\n{PROMPT}\n{PIPELINE_VERSION}".encode()).hexdigest()[:16]
+
+
 messages = [{"role": "system", "content": PROMPT}]
 
+# Pipeline counters: documents, rule-only resolutions, LLM pages and tokens saved
+_extraction_stats = {
+    "documents": 0,
+    "resolved_locally": 0,
+    "llm_pages": 0,
+    "llm_pages_cancelled": 0,
+    "llm_pages_failed": 0,
+    "tokens_saved": 0,
+}
+_extraction_stats_lock = threading.Lock()
+
+
+def _count(**increments):
+    with _extraction_stats_lock:
+        for key, value in increments.items():
+            _extraction_stats[key] += value
+
+
+def get_extraction_stats():
+    """Return document, locally-resolved, LLM page (sent / cancelled / failed) and tokens-saved counters."""
+    with _extraction_stats_lock:
+        return dict(_extraction_stats)
+
+
+# Shared by every extraction in the process so the rate limits hold across sessions.
+# The Groq client (and GROQ_API_KEY from .env) is only needed on the first LLM call;
+# swap the backend, e.g. llm.backend = llm_backends.FakeBackend(), to run offline.
+llm = LLMClient(
+    GroqBackend(),
+    MODEL,
+    max_concurrency=4,
+    requests_per_minute=30,
+    tokens_per_minute=6000,
+    max_attempts=5,
+    page_deadline=90,
+    hedge_percentile=95,  # duplicate a request slower than 95% of those seen so far...
+    hedge_budget=0.1,  # ...for at most 10% of calls
+)
+
+
+# Persistent pool for page OCR, sized to the machine and created on first use
+OCR_WORKERS = os.cpu_count() or 1
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def _init_ocr_worker():
+    """Limit tesseract to one thread per worker; the pool supplies the parallelism."""
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _make_ocr_pool(workers):
+    # spawn (not fork): the Streamlit server process is multi-threaded
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_ocr_worker,
+    )
+
+
+def get_ocr_pool():
+    """Return the shared OCR process pool, starting it on first use."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = _make_ocr_pool(OCR_WORKERS)
+    return _ocr_pool
+
+
+def _read_pdf_bytes(source):
+    """Return the PDF bytes from a path, bytes-like object or binary file object (e.g. a Streamlit upload)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        if source.seekable():
+            source.seek(0)
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def _open_pdf(pdf):
+    """pdfplumber over a path, or over an in-memory stream when given bytes."""
+    return pdfplumber.open(io.BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
+
+
+@contextlib.contextmanager
+def _pdf_path(pdf):
+    """
+    Yield a path to the PDF. Paths pass through; bytes are written once to a
+    private temp file (removed afterwards), so OCR workers and poppler share
+    one copy instead of each page task pickling and re-writing the document.
+    """
+    if not isinstance(pdf, bytes):
+        yield pdf
+        return
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf)
+        yield path
+    finally:
+        os.remove(path)
+
+
+# Page rasterizer for OCR: "pdf2image" (poppler's pdftoppm in a subprocess)
+# or "pypdfium2" (in-process, renders straight into numpy arrays)
+RENDER_BACKEND = "pdf2image"
+RENDER_BACKENDS = ("pdf2image", "pypdfium2")
+RENDER_DPI = 200
+RENDER_GRAYSCALE = False
+
+
+def _render_pages(pdf, first_page, last_page, dpi, grayscale):
+    if isinstance(pdf, bytes):
+        # pdf2image hands poppler a private temp copy; nothing shared is written
+        return convert_from_bytes(pdf, dpi=dpi, grayscale=grayscale, first_page=first_page, last_page=last_page)
+    return convert_from_path(pdf, dpi=dpi, grayscale=grayscale, first_page=first_page, last_page=last_page)
+
+
+# PDFium is not thread-safe, and Streamlit sessions are threads in one process
+_pdfium_lock = threading.Lock()
+
+
+def _render_pages_pdfium(pdf, first_page, last_page, dpi, grayscale):
+    """Yield pages as uint8 arrays (H x W gray or H x W x 3 RGB) rendered by PDFium in-process."""
+    with _pdfium_lock:
+        document = pdfium.PdfDocument(pdf)
+    try:
+        for index in range(first_page - 1, last_page):
+            with _pdfium_lock:
+                page = document[index]
+                bitmap = page.render(scale=dpi / 72, grayscale=grayscale, rev_byteorder=True)
+                # Copy out of PDFium's buffer before it is freed
+                array = bitmap.to_numpy().copy()
+                bitmap.close()
+                page.close()
+            yield array[:, :, 0] if grayscale else array
+    finally:
+        with _pdfium_lock:
+            document.close()
+
+
+def _close_image(image):
+    # PIL images hold native memory until closed; numpy arrays are freed when dropped
+    if hasattr(image, "close"):
+        image.close()
+
+
+def iter_page_images(pdf_path, page_numbers, window=1, backend=None, dpi=None, grayscale=None):
+    """
+    Render the given pages (1-based) lazily, up to `window` consecutive pages
+    per renderer call, so only that many full-resolution images are alive at once.
+    pdf_path may also be the PDF's bytes.
+
+    backend, dpi and grayscale default to RENDER_BACKEND, RENDER_DPI and
+    RENDER_GRAYSCALE. pdf2image yields PIL images, pypdfium2 numpy arrays;
+    pytesseract accepts both.
+    """
+    backend = backend or RENDER_BACKEND
+    if backend not in RENDER_BACKENDS:
+        raise ValueError(f"Unknown render backend {backend!r}; expected one of {RENDER_BACKENDS}")
+    render = _render_pages_pdfium if backend == "pypdfium2" else _render_pages
+    dpi = dpi or RENDER_DPI
+    grayscale = RENDER_GRAYSCALE if grayscale is None else grayscale
+
+    page_numbers = list(page_numbers)
+    i = 0
+    while i < len(page_numbers):
+        j = i + 1
+        while j < len(page_numbers) and j - i < window and page_numbers[j] == page_numbers[j - 1] + 1:
+            j += 1
+        yield from render(pdf_path, page_numbers[i], page_numbers[j - 1], dpi, grayscale)
+        i = j
+
+
+# Adaptive DPI: OCR at OCR_FAST_DPI first, and re-render a page at OCR_FINE_DPI
+# only when tesseract's mean word confidence there is below OCR_MIN_CONFIDENCE
+ADAPTIVE_OCR = True
+OCR_FAST_DPI = 150
+OCR_FINE_DPI = 300
+OCR_MIN_CONFIDENCE = 80
+
+
+def _recognize(image):
+    """OCR one image; returns (text, mean word confidence 0-100, or -1 when no words were found)."""
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    lines = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf < 0 or not word.strip():
+            continue
+        confidences.append(conf)
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+    text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+    return text, sum(confidences) / len(confidences) if confidences else -1.0
+
+
+def _ocr_image(pdf_path, page_number, image, render_seconds, backend, dpi, grayscale, adaptive, fine_dpi,
+               min_confidence):
+    """
+    OCR an already rendered page, escalating to fine_dpi when adaptive and the
+    result looks unreliable (mean confidence below min_confidence). Pages
+    where no words were found at all (blank, figures only) are not escalated.
+    Returns (text, info) where info records the chosen dpi, its confidence and
+    every attempt's dpi/confidence/seconds.
+    """
+    start = time.perf_counter()
+    try:
+        text, confidence = _recognize(image)
+    finally:
+        _close_image(image)
+    attempts = [{"dpi": dpi, "confidence": confidence, "seconds": render_seconds + time.perf_counter() - start}]
+
+    if adaptive and 0 <= confidence < min_confidence and fine_dpi > dpi:
+        start = time.perf_counter()
+        for fine_image in iter_page_images(pdf_path, [page_number], 1, backend, fine_dpi, grayscale):
+            try:
+                fine_text, fine_confidence = _recognize(fine_image)
+            finally:
+                _close_image(fine_image)
+        attempts.append({"dpi": fine_dpi, "confidence": fine_confidence, "seconds": time.perf_counter() - start})
+        if fine_confidence >= confidence:
+            text, confidence, dpi = fine_text, fine_confidence, fine_dpi
+    return text, {"dpi": dpi, "confidence": confidence, "dpi_attempts": attempts}
 
-def is_scanned_pdf(pdf_path):
-    """Check if a PDF is a scanned document (i.e., has no selectable text)."""
-    with pdfplumber.open(pdf_path) as pdf:
-        return not any(page.extract_text() for page in pdf.pages)
 
+def ocr_page(pdf_path, page_number, backend=None, dpi=None, grayscale=None, adaptive=None, fine_dpi=None,
+             min_confidence=None):
+    """
+    Render one page (1-based) and OCR it; returns (text, seconds, info) as in
+    iter_ocr_pages. Runs inside an OCR pool worker.
+    """
+    adaptive = ADAPTIVE_OCR if adaptive is None else adaptive
+    dpi = dpi or (OCR_FAST_DPI if adaptive else RENDER_DPI)
+    fine_dpi = fine_dpi or OCR_FINE_DPI
+    min_confidence = OCR_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    start = time.perf_counter()
+    for image in iter_page_images(pdf_path, [page_number], 1, backend, dpi, grayscale):
+        render_seconds = time.perf_counter() - start
+        text, info = _ocr_image(
+            pdf_path, page_number, image, render_seconds, backend, dpi, grayscale, adaptive, fine_dpi, min_confidence
+        )
+        return text, time.perf_counter() - start, info
+
+
+def iter_ocr_pages(pdf_path, page_numbers, workers=None, window=1, backend=None, dpi=None, grayscale=None,
+                   adaptive=None):
+    """
+    Yield (page_number, text, seconds, info) for the given pages, in order, as each is done.
+
+    Serially (workers=1) pages are rendered `window` at a time and each image
+    is released right after OCR. With a pool, at most 2 x workers pages are in
+    flight, so neither images nor results pile up for long documents.
+    backend, dpi and grayscale are passed to iter_page_images; their defaults
+    are resolved here, so pool workers render with the caller's settings.
+
+    With adaptive (default ADAPTIVE_OCR) pages start at OCR_FAST_DPI and only
+    low-confidence ones (below OCR_MIN_CONFIDENCE, as read when called) are
+    re-rendered at OCR_FINE_DPI; info holds the final
+    "dpi", its "confidence" and the "dpi_attempts" with their timings.
+    """
+    adaptive = ADAPTIVE_OCR if adaptive is None else adaptive
+    backend = backend or RENDER_BACKEND
+    dpi = dpi or (OCR_FAST_DPI if adaptive else RENDER_DPI)
+    grayscale = RENDER_GRAYSCALE if grayscale is None else grayscale
+    # Spawned workers re-import this module with its defaults: pass every setting explicitly
+    render = (backend, dpi, grayscale, adaptive, OCR_FINE_DPI, OCR_MIN_CONFIDENCE)
+    page_numbers = list(page_numbers)
+    workers = workers or OCR_WORKERS
+    if workers == 1 or len(page_numbers) == 1:
+        start = time.perf_counter()
+        for n, image in zip(page_numbers, iter_page_images(pdf_path, page_numbers, window, backend, dpi, grayscale)):
+            render_seconds = time.perf_counter() - start
+            text, info = _ocr_image(pdf_path, n, image, render_seconds, *render)
+            yield n, text, time.perf_counter() - start, info
+            start = time.perf_counter()
+        return
+
+    if workers == OCR_WORKERS:
+        yield from _iter_pool_ocr(get_ocr_pool(), pdf_path, page_numbers, workers * 2, render)
+    else:
+        with _make_ocr_pool(workers) as pool:
+            yield from _iter_pool_ocr(pool, pdf_path, page_numbers, workers * 2, render)
+
+
+def _iter_pool_ocr(pool, pdf_path, page_numbers, max_in_flight, render=()):
+    """Keep up to max_in_flight pages submitted to the pool and yield their results in order."""
+    remaining = iter(page_numbers)
+    pending = deque()
+    try:
+        for n in remaining:
+            pending.append((n, pool.submit(ocr_page, pdf_path, n, *render)))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            n, future = pending.popleft()
+            text, seconds, info = future.result()
+            next_n = next(remaining, None)
+            if next_n is not None:
+                pending.append((next_n, pool.submit(ocr_page, pdf_path, next_n, *render)))
+            yield n, text, seconds, info
+    finally:
+        # Caller stopped early: don't leave queued pages running
+        for _, future in pending:
+            future.cancel()
 
-def extract_text_pdf(pdf_path):
-    """Extract text from a PDF using pdfplumber."""
-    texts = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                texts.append(text.strip())
-    return texts
 
+def iter_text_ocr(pdf_path, workers=None, window=1, backend=None, adaptive=None):
+    """Yield OCR text for every page of the PDF, in page order (see iter_ocr_pages)."""
+    with _open_pdf(pdf_path) as pdf:
+        page_numbers = range(1, len(pdf.pages) + 1)
+    for _, text, _, _ in iter_ocr_pages(pdf_path, page_numbers, workers, window, backend, adaptive=adaptive):
+        yield text
 
-def extract_text_ocr(pdf_path):
-    """Extract text from a scanned PDF using OCR (Tesseract)."""
-    images = convert_from_path(pdf_path)
-    return [pytesseract.image_to_string(img) for img in images]
+
+def extract_text_ocr(pdf_path, workers=None):
+    """
+    Extract text from a scanned PDF using OCR (Tesseract).
+    Pages are OCRed in parallel on the pool (see iter_ocr_pages); results keep page order.
+    """
+    return list(iter_text_ocr(pdf_path, workers))
+
+
+# Pages whose text layer has fewer characters than this are OCRed instead
+MIN_TEXT_CHARS = 20
+
+
+def extract_pages(pdf_path, workers=None, min_text_chars=MIN_TEXT_CHARS, backend=None, check_cancelled=None):
+    """
+    Extract every page in a single pass over the PDF (a path or its bytes).
+
+    The text layer is read once per page (from memory for bytes); only pages
+    whose text layer is empty or shorter than min_text_chars are rasterized
+    and OCRed, from a path shared with the workers (see _pdf_path). Returns one dict
+    per page: {"page", "text", "source": "text" | "ocr", "seconds"}; OCRed
+    pages also carry "dpi", "confidence" and "dpi_attempts" (see iter_ocr_pages).
+    backend picks the page renderer (default RENDER_BACKEND). check_cancelled,
+    if given, is called between pages and may raise to abandon the document;
+    OCR pages still queued on the pool are then dropped.
+    """
+    check_cancelled = check_cancelled or (lambda: None)
+    pages = []
+    with _open_pdf(pdf_path) as pdf:
+        for number, page in enumerate(pdf.pages, 1):
+            check_cancelled()
+            start = time.perf_counter()
+            text = (page.extract_text() or "").strip()
+            pages.append({"page": number, "text": text, "source": "text", "seconds": time.perf_counter() - start})
+
+    sparse = {p["page"]: p for p in pages if len(p["text"]) < min_text_chars}
+    if sparse:
+        with _pdf_path(pdf_path) as path, contextlib.closing(iter_ocr_pages(path, sparse, workers, backend=backend)) as ocr_pages:
+            for number, text, seconds, info in ocr_pages:
+                sparse[number].update(text=text.strip(), source="ocr", seconds=sparse[number]["seconds"] + seconds, **info)
+                check_cancelled()
+    return pages
 
 
 def extract_text(pdf_path):
-    """Decide whether to use pdfplumber or OCR to extract text."""
-    return extract_text_ocr(pdf_path) if is_scanned_pdf(pdf_path) else extract_text_pdf(pdf_path)
+    """Return the non-empty page texts, using the text layer or OCR per page."""
+    return [page["text"] for page in extract_pages(pdf_path) if page["text"]]
 
 
-async def process_page(page_text, index):
+async def process_page(page_text, index, fields=None, hedge=True):
     """
-    Send extracted text to the AI model and immediately retry on 429 or 500 errors.
-    This function will retry indefinitely until a successful response is obtained.
+    Send extracted text to the AI model through the rate-limited client.
+    Retries are bounded (see LLMClient); a page that still fails yields None.
+    If fields is given, only those keys are asked for and kept. With hedge, a
+    tail-latency request is raced against one duplicate (see LLMClient).
     """
-    while True:
+    content = page_text
+    if fields:
+        content += "\n\nOnly these keys are still needed: " + ", ".join(fields)
+
+    try:
+        data = await llm.complete_json(messages + [{"role": "user", "content": content}], hedge=hedge)
+        return {k: v for k, v in data.items() if v is not None and (not fields or k in fields)}
+
+    except asyncio.CancelledError:
+        # Instead of propagating, return an empty result for this page.
+        return {}
+
+    except Exception:
+        # Counted by iter_fields (timings["llm_pages_failed"]) and in get_extraction_stats()
+        return None
+
+
+def _stage_timer(timings):
+    """Return stage(name), which adds the seconds since its previous call to timings[name]."""
+    last = time.perf_counter()
+
+    def stage(name):
+        nonlocal last
+        now = time.perf_counter()
+        timings[name] = timings.get(name, 0.0) + now - last
+        last = now
+
+    return stage
+
+
+async def iter_fields(pages, timings=None):
+    """
+    Turn extracted pages (see extract_pages) into fields, yielding progress as it goes.
+
+    Yields (done, total, partial) tuples: total is the number of pages sent to
+    the LLM, done how many have answered, partial the fields found so far.
+    Rule-based fields come first and LLM pages fill what is still missing as
+    they complete (the first answer for a field wins). Once all TARGET_FIELDS
+    are known, the outstanding page requests are cancelled. The last partial
+    is the final result.
+
+    Pages that still failed after the client's retries are counted in
+    timings["llm_pages_failed"]; the result is then incomplete and should not
+    be cached.
+    """
+    timings = {} if timings is None else timings
+    stage = _stage_timer(timings)
+    pages_text = [page["text"] for page in pages if page["text"]]
+
+    # Deterministic rules first; the LLM is only asked for what they missed
+    final_result = extract_fields_from_pages(pages_text)
+    missing = [field for field in TARGET_FIELDS if field not in final_result]
+    _count(documents=1, resolved_locally=int(not missing))
+    stage("rules")
+
+    llm_pages = []
+    tokens_saved = 0
+    if missing:
+        # Only pages with labels for the still-missing fields, de-duplicated, go to the LLM
+        llm_pages, report = filter_pages(pages_text, missing)
+        tokens_saved = report["tokens_saved"]
+        _count(llm_pages=len(llm_pages), tokens_saved=tokens_saved)
+    timings["llm_pages"] = len(llm_pages)
+    timings["llm_pages_failed"] = 0
+    timings["tokens_saved"] = tokens_saved
+    stage("filter")
+    yield 0, len(llm_pages), dict(final_result)
+
+    if llm_pages:
+        start_time = time.perf_counter()  # More precise timer than time.time()
+        tasks = [asyncio.ensure_future(process_page(page_text, i, missing)) for i, page_text in enumerate(llm_pages)]
         try:
-            response = await client.chat.completions.create(
-                messages=messages + [{"role": "user", "content": page_text}],
-                model="llama3-70b-8192",
-                response_format={"type": "json_object"}
-            )
-            data = json.loads(response.choices[0].message.content)
-            return {k: v for k, v in data.items() if v is not None}
-
-        except RateLimitError as e:
-            retry_after = None
-            if hasattr(e, "response") and e.response is not None:
-                retry_after = e.response.headers.get("Retry-After")
-            if retry_after:                
-                await asyncio.sleep(float(retry_after))
-            continue
+            for done, next_page in enumerate(asyncio.as_completed(tasks), 1):
+                res = await next_page
+                if res is None:
+                    timings["llm_pages_failed"] += 1
+                    _count(llm_pages_failed=1)
+                    res = {}
+                final_result.update({k: v for k, v in res.items() if k not in final_result})
+                yield done, len(llm_pages), dict(final_result)
+                if all(field in final_result for field in TARGET_FIELDS):
+                    break
+        finally:
+            # Early stop (or the caller went away): drop the requests still in flight
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            _count(llm_pages_cancelled=len(pending))
+        end_time = time.perf_counter()
+        print(f"Elapsed time: {end_time - start_time:.6f} seconds")
+        # Time the caller spent handling yielded progress is counted here too
+        stage("llm")
 
-        except BadRequestError as e:
-            continue
 
-        except HTTPStatusError as e:
-            if e.response.status_code in (429, 500, 502, 503, 504, 400):
-                retry_after = e.response.headers.get("Retry-After")
-                if retry_after:
-                    await asyncio.sleep(float(retry_after))
-                continue
-            else:
-                raise
+async def iter_extraction(pdf_file, use_cache=True, timings=None, backend=None, check_cancelled=None):
+    """
+    Extract structured medical data from a PDF, yielding progress as it goes
+    (the (done, total, partial) tuples of iter_fields).
 
-        except asyncio.CancelledError:
-            # Instead of propagating, return an empty result for this page.
-            return {}        
+    pdf_file may be a path, the PDF's bytes or a binary file object; it is
+    read into memory once. Only a document that needs OCR is written to disk,
+    once, to a private temp file (see extract_pages).
 
+    With use_cache, repeat uploads of the same bytes return the stored JSON,
+    and after a prompt/model change the stored page text skips OCR.
 
-async def extract_medical_data_async(pdf_file):
+    timings, if given, is a dict filled with the seconds spent per stage
+    ("read", "cache", "extract", "rules", "filter", "llm") and the page counts
+    ("pages", "ocr_pages", "llm_pages", "llm_pages_failed") and the LLM tokens
+    saved by page filtering ("tokens_saved"). A result with
+    failed LLM pages is returned but not cached, so the next upload retries it.
+    backend is the OCR page renderer and check_cancelled a per-page cancel
+    check (see extract_pages).
     """
-    Extract structured medical data asynchronously from a PDF.
-    Each page is processed concurrently.
+    timings = {} if timings is None else timings
+    stage = _stage_timer(timings)
+
+    pdf_bytes = _read_pdf_bytes(pdf_file)
+    digest = pdf_digest(pdf_bytes)
+    cache = get_extraction_cache() if use_cache else None
+    stage("read")
+
+    if cache is not None:
+        cached = cache.get_result(digest, PROMPT_VERSION)
+        stage("cache")
+        if cached is not None:
+            yield 0, 0, cached
+            return
+
+    pages = cache.get_pages(digest) if cache is not None else None
+    stage("cache")
+    if pages is None:
+        pages = extract_pages(pdf_bytes, backend=backend, check_cancelled=check_cancelled)
+        if cache is not None:
+            cache.put_pages(digest, pages)
+    timings.update(pages=len(pages), ocr_pages=sum(page["source"] == "ocr" for page in pages))
+    stage("extract")
+
+    final_result = {}
+    fields = iter_fields(pages, timings)
+    try:
+        async for done, total, partial in fields:
+            final_result = partial
+            yield done, total, partial
+    finally:
+        await fields.aclose()
+    stage = _stage_timer(timings)
+
+    if cache is not None and not timings.get("llm_pages_failed"):
+        cache.put_result(digest, PROMPT_VERSION, final_result)
+        stage("cache")
+
+
+async def extract_medical_data_async(pdf_file, use_cache=True, progress=None, timings=None, backend=None,
+                                     check_cancelled=None):
     """
-    pages_text = extract_text(pdf_file)
-    start_time = time.perf_counter()  # More precise timer than time.time()
-    tasks = [process_page(page_text, i) for i, page_text in enumerate(pages_text)]
-    
-    results = await asyncio.gather(*tasks)
-    end_time = time.perf_counter()
-    print(f"Elapsed time: {end_time - start_time:.6f} seconds")
+    Extract structured medical data asynchronously from a PDF.
+    Pages are processed concurrently; see iter_extraction (also for timings,
+    backend and check_cancelled).
 
+    progress, if given, is called as progress(done, total, partial) each time
+    a page completes.
+    """
     final_result = {}
-    for res in results:
-        final_result.update(res)
+    extraction = iter_extraction(
+        pdf_file, use_cache=use_cache, timings=timings, backend=backend, check_cancelled=check_cancelled
+    )
+    async for done, total, partial in extraction:
+        final_result = partial
+        if progress is not None:
+            progress(done, total, partial)
     return final_result
 
 
-def extract_medical_data(pdf_file, timeout=300):
+def extract_medical_data(pdf_file, timeout=300, progress=None, use_cache=True, timings=None, backend=None):
     """
     Synchronous wrapper for the asynchronous extraction.
     If the process exceeds timeout seconds, a TimeoutError is raised.
     """
     return asyncio.run(
-        asyncio.wait_for(extract_medical_data_async(pdf_file), timeout=timeout)
+        asyncio.wait_for(
+            extract_medical_data_async(
+                pdf_file, use_cache=use_cache, progress=progress, timings=timings, backend=backend
+            ),
+            timeout=timeout,
+        )
     )
 
 
@@ -0,0 +1,70 @@
+import re
+from collections import Counter
+
+from rule_extractor import FIELD_LABELS, TARGET_FIELDS
+
+# A line must repeat on at least this share of pages (and on 2+) to count as header/footer
+REPEATED_LINE_SHARE = 0.5
+
+
+def _line_key(line):
+    """Normalise a line so "Page 1 of 3" and "Page 2 of 3" compare equal."""
+    return re.sub(r"\d+", "#", re.sub(r"\s+", " ", line.strip().lower()))
+
+
+def _has_label(line, fields=TARGET_FIELDS):
+    return any(FIELD_LABELS[field].search(line) for field in fields)
+
+
+def score_page(text, fields=TARGET_FIELDS):
+    """Number of lines that carry a label for one of `fields`."""
+    return sum(1 for line in text.splitlines() if _has_label(line, fields))
+
+
+def repeated_lines(pages_text):
+    """Line keys found on enough pages to be a running header or footer."""
+    if len(pages_text) < 2:
+        return set()
+    counts = Counter()
+    for text in pages_text:
+        counts.update({_line_key(line) for line in text.splitlines() if line.strip()})
+    threshold = max(2, REPEATED_LINE_SHARE * len(pages_text))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def compact_text(text, drop=frozenset()):
+    """Collapse whitespace, drop blank lines and any line whose key is in `drop`."""
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"[ \t\f\v]+", " ", line).strip()
+        # Never drop a line that carries a field label, even if it repeats
+        if line and (_line_key(line) not in drop or _has_label(line)):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def filter_pages(pages_text, fields=TARGET_FIELDS):
+    """
+    Prepare page texts for the LLM.
+
+    Pages without a single field label (cover pages, disclaimers) are dropped,
+    unless no page has one, in which case all are kept. Headers/footers
+    repeated across pages are stripped and whitespace is collapsed.
+    Returns (kept_texts, report) where report counts pages, characters and
+    the tokens saved (~4 characters per token).
+    """
+    drop = repeated_lines(pages_text)
+    scores = [score_page(text, fields) for text in pages_text]
+    relevant = [text for text, score in zip(pages_text, scores) if score] or list(pages_text)
+    kept = [text for text in (compact_text(text, drop) for text in relevant) if text]
+
+    chars_in = sum(len(text) for text in pages_text)
+    chars_out = sum(len(text) for text in kept)
+    report = {
+        "pages_in": len(pages_text),
+        "pages_kept": len(kept),
+        "chars_in": chars_in,
+        "chars_out": chars_out,
+        "tokens_saved": (chars_in - chars_out) // 4,
+    }
+    return kept, report
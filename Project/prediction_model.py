@@ -1,20 +1,76 @@
-import pandas as pd
-import joblib
+import hashlib
+import os
+import threading
+import time
+
 import numpy as np
+from cachetools import TTLCache
+
+from feature_schema import (
+    DEFAULT_SCHEMA_PATH,
+    check_schema,
+    encode_patient,
+    encode_patients,
+    load_schema,
+    save_schema,
+)
+
+DEFAULT_MODEL_PATH = "heart_disease_xgb_model.ubj"
+PICKLED_MODEL_PATH = "heart_disease_xgb_model.pkl"
+
+# Extensions XGBoost reads natively (no unpickling, stable across versions)
+NATIVE_MODEL_EXTENSIONS = (".ubj", ".json")
+
+
+def get_features():
+    """Return the one-hot feature column order the model was trained on."""
+    return load_schema()["features"]
+
+
+def __getattr__(name):
+    # `features` used to be built from heart1.csv at import time; it is now
+    # read lazily from the precomputed schema.
+    if name == "features":
+        return get_features()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# heart_patient_data ENUM labels -> codes the model was trained on
+DB_LABEL_MAPS = {
+    "ChestPainType": {
+        "Typical Chest Pain During Activity": "TA",
+        "Unusual Chest Pain": "ATA",
+        "Discomfort around Chest Area": "NAP",
+        "No Chest Pain / Silent Symptoms": "ASY",
+    },
+    "RestingECG": {
+        "Normal": "Normal",
+        "ST-T Wave Abnormality": "ST",
+        "Left Ventricular Hypertrophy": "LVH",
+    },
+    "ST_Slope": {
+        "Upsloping": "Up",
+        "Flat": "Flat",
+        "Downsloping": "Down",
+    },
+}
 
-# Load and preprocess dataset
-df = pd.read_csv("heart1.csv")
-df.drop(["HeartDisease"], axis=1, inplace=True)
-category_cols = [
-    "Sex",
-    "ChestPainType",
-    "RestingECG",
-    "ExerciseAngina",
-    "ST_Slope",
-    "FastingBS",
+# Column order of the heart_patient_data SELECTs that feed db_row_to_patient
+DB_PATIENT_COLUMNS = [
+    "Age", "Sex", "ChestPainType", "RestingBP", "Cholesterol", "FastingBS",
+    "RestingECG", "MaxHR", "ExerciseAngina", "Oldpeak", "ST_Slope",
 ]
-df = pd.get_dummies(df, columns=category_cols)
-features = df.columns.tolist()
+
+
+def db_row_to_patient(row):
+    """Turn a heart_patient_data row (DB_PATIENT_COLUMNS order) into a model-ready patient dict."""
+    patient = dict(zip(DB_PATIENT_COLUMNS, row))
+    for col, mapping in DB_LABEL_MAPS.items():
+        patient[col] = mapping.get(patient[col], patient[col])
+    # The table stores fasting blood sugar in mg/dL; the model wants the >=120 flag
+    patient["FastingBS"] = 0 if patient["FastingBS"] < 120 else 1
+    return patient
+
 
 # “Healthy” thresholds for quick flags
 normal_ranges = {
@@ -39,32 +95,299 @@ def check_risk_factors(patient):
     return flags
 
 
-def predict_heart_disease(patient, model_path="heart_disease_xgb_model.pkl"):
-    """Load model, predict disease risk, risk level, and flag abnormal vitals."""
-    model = joblib.load(model_path)
+# Bits set by risk_factor_mask, one per check in check_risk_factors
+FLAG_RESTING_BP = 1
+FLAG_CHOLESTEROL = 2
+FLAG_MAX_HR = 4
+FLAG_OLDPEAK = 8
+
+
+def risk_factor_mask(resting_bp, cholesterol, max_hr, oldpeak):
+    """Vectorized check_risk_factors: a uint8 bitmask of FLAG_* values per row."""
+    mask = np.zeros(np.shape(resting_bp), dtype=np.uint8)
+    mask[np.asarray(resting_bp) > normal_ranges["RestingBP"]] |= FLAG_RESTING_BP
+    mask[np.asarray(cholesterol) > normal_ranges["Cholesterol"]] |= FLAG_CHOLESTEROL
+    mask[np.asarray(max_hr) < normal_ranges["MaxHR"]] |= FLAG_MAX_HR
+    mask[np.asarray(oldpeak) > normal_ranges["Oldpeak"]] |= FLAG_OLDPEAK
+    return mask
+
+
+# Process-wide model cache. Streamlit serves every session from the same
+# process, so a model loaded here once is shared by all of them.
+_models = {}
+_boosters = {}
+_model_stats = {}
+_model_lock = threading.Lock()
+
+# Per-thread input row reused by the single-patient fast path
+_row_buffers = threading.local()
+
+# Recent predictions keyed on (model version, encoded feature bytes): bounded
+# LRU whose entries also expire, so repeated "Analyze" clicks skip the model.
+PREDICTION_CACHE_SIZE = 4096
+PREDICTION_CACHE_TTL = 3600  # seconds
+_prediction_cache = TTLCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+_prediction_cache_lock = threading.Lock()
+_prediction_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _rss_bytes():
+    """Current resident set size of this process, or None where unsupported."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _read_model(model_path, nthread=None):
+    """Read an XGBClassifier from a native .ubj/.json file or a joblib pickle."""
+    if model_path.endswith(NATIVE_MODEL_EXTENSIONS):
+        import xgboost as xgb
+
+        model = xgb.XGBClassifier()
+        model.load_model(model_path)
+    else:
+        import joblib
+
+        model = joblib.load(model_path)
+
+    if nthread is not None:
+        model.set_params(n_jobs=nthread)
+        model.get_booster().set_param({"nthread": nthread})
+    return model
+
+
+def export_native_model(pickle_path=PICKLED_MODEL_PATH, output_path=DEFAULT_MODEL_PATH):
+    """
+    Convert the pickled model to XGBoost's native format and save the feature
+    schema beside it, unless that is where the schema is already read from.
+    """
+    model = _read_model(pickle_path)
+    check_schema(load_schema(), model.get_booster())
+    model.save_model(output_path)
+    schema_path = os.path.join(os.path.dirname(output_path), DEFAULT_SCHEMA_PATH)
+    if os.path.abspath(schema_path) != os.path.abspath(DEFAULT_SCHEMA_PATH):
+        save_schema(load_schema(), schema_path)
+    return output_path
+
+
+def _file_digest(path):
+    """Short SHA-256 of a file's bytes, used as the model version."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()[:16]
+
+
+def load_model(model_path=DEFAULT_MODEL_PATH, nthread=None):
+    """
+    Return the cached model for model_path, loading it on first use.
+
+    Native .ubj/.json files are read straight into the booster; anything else
+    is treated as a joblib pickle. nthread sets the booster's thread count
+    when the model is first loaded (None keeps XGBoost's default).
+    """
+    model = _models.get(model_path)
+    if model is not None:
+        return model
+
+    with _model_lock:
+        model = _models.get(model_path)
+        if model is None:
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            model = _read_model(model_path, nthread)
+            load_seconds = time.perf_counter() - start
+            booster = model.get_booster()
+            check_schema(load_schema(), booster)
+            rss_after = _rss_bytes()
+
+            _model_stats[model_path] = {
+                "load_seconds": load_seconds,
+                "file_bytes": os.path.getsize(model_path),
+                "booster_bytes": len(booster.save_raw()),
+                "rss_delta_bytes": (
+                    rss_after - rss_before
+                    if rss_before is not None and rss_after is not None
+                    else None
+                ),
+                "version": _file_digest(model_path),
+                "nthread": nthread,
+                "warmup_seconds": None,
+            }
+            _boosters[model_path] = (booster, _iteration_range(booster))
+            _models[model_path] = model
+    return model
 
-    # Prepare data for model
-    x = pd.DataFrame([patient])
-    x = pd.get_dummies(x)
-    for col in features:
-        if col not in x.columns:
-            x[col] = 0
-    x = x[features]
 
-    # Predict probability & class
-    prob = model.predict_proba(x)[:, 1][0]
-    pred = int(prob > 0.5)
+def _iteration_range(booster):
+    """Trees to use at inference: up to best_iteration when trained with early stopping."""
+    best_iteration = booster.attr("best_iteration")
+    if best_iteration is None:
+        return (0, 0)
+    return (0, int(best_iteration) + 1)
+
+
+def load_booster(model_path=DEFAULT_MODEL_PATH):
+    """Return the cached (booster, iteration_range) pair for model_path."""
+    load_model(model_path)
+    return _boosters[model_path]
+
+
+def _row_buffer():
+    """Return this thread's preallocated 1 x n_features float32 input row."""
+    row = getattr(_row_buffers, "row", None)
+    if row is None:
+        row = np.zeros((1, len(get_features())), dtype=np.float32)
+        _row_buffers.row = row
+    return row
+
+
+def _risk_level(prob):
+    """Map a disease probability to the Healthy / Moderate / Severe label."""
     if prob > 0.8:
-        level = "Severe"
+        return "Severe"
     elif prob > 0.4:
-        level = "Moderate"
-    else:
-        level = "Healthy"
+        return "Moderate"
+    return "Healthy"
+
+
+def warm_up_model(model_path=DEFAULT_MODEL_PATH):
+    """Load the model and run one dummy prediction so the first real call is fast."""
+    model = load_model(model_path)
+    booster, iteration_range = load_booster(model_path)
+    stats = _model_stats[model_path]
+    if stats["warmup_seconds"] is None:
+        start = time.perf_counter()
+        booster.inplace_predict(_row_buffer(), iteration_range=iteration_range)
+        stats["warmup_seconds"] = time.perf_counter() - start
+    return model
+
+
+def get_model_stats():
+    """Return load time and memory stats for every model loaded in this process."""
+    with _model_lock:
+        return {path: dict(stats) for path, stats in _model_stats.items()}
+
+
+def _encode_for_cache(patient, model_path):
+    """Encode patient into this thread's reused row; returns (row, prediction cache key)."""
+    load_booster(model_path)
+    row = _row_buffer()
+    encode_patient(patient, out=row[0])
+    return row, (_model_stats[model_path]["version"], row.tobytes())
+
+
+def get_cached_prediction(patient, model_path=DEFAULT_MODEL_PATH):
+    """Return the memoized (pred, prob, level, flags) for patient, or None; counts a hit or miss."""
+    _, key = _encode_for_cache(patient, model_path)
+    with _prediction_cache_lock:
+        cached = _prediction_cache.get(key)
+        _prediction_cache_stats["hits" if cached is not None else "misses"] += 1
+    if cached is None:
+        return None
+    return (*cached, check_risk_factors(patient))
+
+
+def cache_prediction(patient, pred, prob, level, model_path=DEFAULT_MODEL_PATH):
+    """Memoize a prediction scored elsewhere (e.g. by the micro-batcher) for patient."""
+    _, key = _encode_for_cache(patient, model_path)
+    with _prediction_cache_lock:
+        _prediction_cache[key] = (pred, prob, level)
+
+
+def predict_heart_disease(patient, model_path=DEFAULT_MODEL_PATH, use_cache=True):
+    """
+    Predict disease risk, risk level, and flag abnormal vitals using the cached model.
+
+    Results are memoized on the encoded feature vector and the model version,
+    so an unchanged record is scored once per PREDICTION_CACHE_TTL.
+    """
+    booster, iteration_range = load_booster(model_path)
+    row, key = _encode_for_cache(patient, model_path)
+    cached = None
+    if use_cache:
+        with _prediction_cache_lock:
+            cached = _prediction_cache.get(key)
+            _prediction_cache_stats["hits" if cached is not None else "misses"] += 1
 
+    if cached is None:
+        prob = float(booster.inplace_predict(row, iteration_range=iteration_range)[0])
+        cached = (int(prob > 0.5), prob, _risk_level(prob))
+        if use_cache:
+            with _prediction_cache_lock:
+                _prediction_cache[key] = cached
+
+    pred, prob, level = cached
+    # Flags echo the raw values, so they are always rebuilt from this patient
     flags = check_risk_factors(patient)
     return pred, prob, level, flags
 
 
+def get_prediction_cache_stats():
+    """Return prediction cache hits, misses, hit rate and current size."""
+    with _prediction_cache_lock:
+        hits = _prediction_cache_stats["hits"]
+        misses = _prediction_cache_stats["misses"]
+        size = len(_prediction_cache)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+        "size": size,
+        "maxsize": _prediction_cache.maxsize,
+        "ttl": _prediction_cache.ttl,
+    }
+
+
+def clear_prediction_cache():
+    """Drop every cached prediction (e.g. after swapping model files in place)."""
+    with _prediction_cache_lock:
+        _prediction_cache.clear()
+
+
+def _slice_rows(data, start, stop):
+    """Rows start:stop of a list, DataFrame or NumPy matrix."""
+    if hasattr(data, "iloc"):
+        return data.iloc[start:stop]
+    return data[start:stop]
+
+
+def predict_heart_disease_batch(data, model_path=DEFAULT_MODEL_PATH, chunk_size=None):
+    """
+    Score many patients with one vectorized encode and predict per chunk.
+
+    data may be a list of patient dicts, a DataFrame with the raw columns, or
+    an already-encoded NumPy matrix. chunk_size caps how many rows are encoded
+    at once to bound peak memory on very large inputs.
+
+    Returns (predictions, probabilities, risk_levels, flags) arrays, where
+    flags is the risk_factor_mask bitmask for each row.
+    """
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive number of rows, got {chunk_size}")
+    booster, iteration_range = load_booster(model_path)
+    n = len(data)
+    step = chunk_size or max(n, 1)
+
+    probs = np.empty(n, dtype=np.float32)
+    flags = np.empty(n, dtype=np.uint8)
+    for start in range(0, n, step):
+        x, columns = encode_patients(_slice_rows(data, start, start + step))
+        stop = start + len(x)
+        probs[start:stop] = booster.inplace_predict(x, iteration_range=iteration_range)
+        flags[start:stop] = risk_factor_mask(
+            columns["RestingBP"], columns["Cholesterol"], columns["MaxHR"], columns["Oldpeak"]
+        )
+
+    preds = (probs > 0.5).astype(np.int8)
+    levels = np.select([probs > 0.8, probs > 0.4], ["Severe", "Moderate"], "Healthy")
+    return preds, probs, levels, flags
+
+
 def calculate_cardiovascular_age(patient):
     """Estimate cardiovascular age by adding years for each risk tier."""
     age = patient["Age"]
@@ -115,6 +438,30 @@ def calculate_cardiovascular_age(patient):
     return age + extra
 
 
+def calculate_cardiovascular_age_batch(
+    age, resting_bp, cholesterol, max_hr, oldpeak, exercise_angina, fasting_bs
+):
+    """
+    Vectorized calculate_cardiovascular_age over column arrays.
+
+    Each np.select mirrors one if/elif ladder above (NaN falls through to 0
+    just like the scalar comparisons), so results match row for row.
+    """
+    bp = np.asarray(resting_bp)
+    chol = np.asarray(cholesterol)
+    hr = np.asarray(max_hr)
+    op = np.asarray(oldpeak)
+
+    extra = np.select([bp > 140, bp > 130, bp > 120], [7, 5, 2], 0)
+    extra += np.select([chol > 280, chol > 240, chol > 200], [8, 5, 3], 0)
+    extra += np.select([hr < 90, hr < 120], [7, 4], 0)
+    extra += np.select([op > 2.0, op > 1.0], [7, 4], 0)
+    extra += np.where(np.asarray(exercise_angina, dtype=object) == "Yes", 4, 0)
+    extra += np.where(np.asarray(fasting_bs, dtype=object) == 1, 3, 0)
+
+    return np.asarray(age) + np.minimum(extra, 20)
+
+
 # --- Example usage ---
 patients = [
     {
@@ -164,9 +511,7 @@ patients = [
 if __name__ == "__main__":
     for i, p in enumerate(patients, 1):
         actual_age = p["Age"]
-        pred, prob, level, flags = predict_heart_disease(
-            p, model_path="heart_disease_xgb_model.pkl"
-        )
+        pred, prob, level, flags = predict_heart_disease(p, model_path=DEFAULT_MODEL_PATH)
         cardio_age = calculate_cardiovascular_age(p)
 
         print(f"\nPatient {i}:")
@@ -0,0 +1,121 @@
+import argparse
+import os
+import time
+
+from db import get_db_connection
+from prediction_model import (
+    DB_PATIENT_COLUMNS,
+    DEFAULT_MODEL_PATH,
+    db_row_to_patient,
+    predict_heart_disease_batch,
+    warm_up_model,
+)
+
+DEFAULT_CHECKPOINT_PATH = "rescore.checkpoint"
+
+
+def read_checkpoint(checkpoint_path):
+    """Return the last id written by a previous run, or 0 when starting fresh."""
+    if not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path) as f:
+        return int(f.read().strip() or 0)
+
+
+def write_checkpoint(checkpoint_path, last_id):
+    """Atomically record the last id whose score has been committed."""
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(last_id))
+    os.replace(tmp_path, checkpoint_path)
+
+
+def rescore(chunk_size=1000, only_missing=False, checkpoint_path=DEFAULT_CHECKPOINT_PATH,
+            model_path=DEFAULT_MODEL_PATH):
+    """
+    Recompute risk_percentage for every heart_patient_data row.
+
+    Rows are streamed in id order through an unbuffered (server-side) cursor,
+    scored chunk by chunk with one batched model call, and written back with
+    executemany on a second connection. The last committed id is checkpointed
+    after each chunk so an interrupted run resumes where it stopped.
+    """
+    warm_up_model(model_path)
+    last_id = read_checkpoint(checkpoint_path)
+    if last_id:
+        print(f"Resuming after id {last_id}")
+
+    read_conn = get_db_connection()
+    write_conn = get_db_connection()
+    read_cursor = read_conn.cursor(buffered=False)
+    write_cursor = write_conn.cursor()
+
+    query = f"SELECT id, {', '.join(DB_PATIENT_COLUMNS)} FROM heart_patient_data WHERE id > %s"
+    if only_missing:
+        query += " AND risk_percentage IS NULL"
+    query += " ORDER BY id"
+
+    total = 0
+    start = time.perf_counter()
+    try:
+        read_cursor.execute(query, (last_id,))
+        while True:
+            rows = read_cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+
+            ids = [row[0] for row in rows]
+            patients = [db_row_to_patient(row[1:]) for row in rows]
+            _, probs, _, _ = predict_heart_disease_batch(patients, model_path=model_path)
+
+            write_cursor.executemany(
+                "UPDATE heart_patient_data SET risk_percentage = %s WHERE id = %s",
+                [(float(prob) * 100, row_id) for prob, row_id in zip(probs, ids)],
+            )
+            write_conn.commit()
+            write_checkpoint(checkpoint_path, ids[-1])
+
+            total += len(rows)
+            elapsed = time.perf_counter() - start
+            print(f"Scored {total} rows (last id {ids[-1]}, {total / elapsed:.0f} rows/s)")
+    finally:
+        read_cursor.close()
+        write_cursor.close()
+        read_conn.close()
+        write_conn.close()
+
+    # A finished run leaves nothing to resume
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed else 0
+    print(f"Done: {total} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return total
+
+
+def main():
+    """CLI interface for re-scoring the heart_patient_data table."""
+    parser = argparse.ArgumentParser(
+        description="Recompute risk_percentage for heart_patient_data rows with the current model."
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows fetched and scored per batch (default: 1000)")
+    parser.add_argument("--only-missing", action="store_true", help="Only score rows whose risk_percentage is NULL")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="File recording the last committed id")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the first row")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="Model file to score with")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    rescore(
+        chunk_size=args.chunk_size,
+        only_missing=args.only_missing,
+        checkpoint_path=args.checkpoint,
+        model_path=args.model,
+    )
+
+
+if __name__ == "__main__":
+    main()
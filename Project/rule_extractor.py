@@ -0,0 +1,225 @@
+import re
+
+# The eleven keys requested by ocr.PROMPT, in prompt order
+TARGET_FIELDS = [
+    "Age",
+    "Sex",
+    "ChestPainType",
+    "RestingBP",
+    "Cholesterol",
+    "FastingBS",
+    "RestingECG",
+    "MaxHR",
+    "ExerciseAngina",
+    "Oldpeak",
+    "ST_Slope",
+]
+
+_NUM = r"(\d{1,3}(?:\.\d+)?)"
+# optional "(units)" then ":" / "=" / "-" (but not the minus sign of "-1.5")
+_SEP = r"\s*(?:\([^)\n]*\))?\s*(?:[:=]|-(?!\d))?\s*"
+
+# Numeric fields: label synonyms (as regex) -> (value pattern, unit conversions, cast, plausible range)
+_NUMERIC_RULES = {
+    "Age": (
+        [r"\bage\s*/\s*(?:sex|gender)\b", r"\bage\b"],
+        _NUM + r"\s*(?:years?|yrs?|y)?\b",
+        {},
+        int,
+        (1, 120),
+    ),
+    "RestingBP": (
+        [r"\bresting\s+(?:blood\s+pressure|bp)\b", r"\bblood\s+pressure\b", r"\bb\.?p\b\.?", r"\bsystolic\b"],
+        _NUM + r"(?:\s*/\s*\d{2,3})?\s*(?:mm\s*hg)?",
+        {},
+        int,
+        (60, 260),
+    ),
+    "Cholesterol": (
+        [r"\btotal\s+cholesterol\b", r"\bcholesterol,?\s*total\b", r"\bserum\s+cholesterol\b", r"(?<![a-z-])cholesterol\b"],
+        r"(\d{1,3}(?:\.\d+)?)\s*(mg\s*/\s*dl|mmol\s*/\s*l)?",
+        {"mmol/l": 38.67},
+        int,
+        (50, 700),
+    ),
+    "FastingBS": (
+        [
+            r"\bfasting\s+(?:blood|plasma|serum)\s+(?:sugar|glucose)\b",
+            r"\bglucose,?\s*fasting\b",
+            r"\bfasting\s+glucose\b",
+            r"\bf\.?b\.?s\b\.?",
+            r"\bf\.?b\.?g\b\.?",
+            r"\bf\.?p\.?g\b\.?",
+        ],
+        r"(\d{1,3}(?:\.\d+)?)\s*(mg\s*/\s*dl|mmol\s*/\s*l)?",
+        {"mmol/l": 18.0},
+        int,
+        (20, 700),
+    ),
+    "MaxHR": (
+        [
+            r"\bmax(?:imum|\.)?\s+heart\s+rate(?:\s+achieved)?\b",
+            r"\bpeak\s+heart\s+rate\b",
+            r"\bmax\s*hr\b",
+            r"\bhr\s*max\b",
+            r"\bthalach\b",
+        ],
+        _NUM + r"\s*(?:bpm|beats?\s*/\s*min(?:ute)?)?",
+        {},
+        int,
+        (40, 250),
+    ),
+    "Oldpeak": (
+        [r"\boldpeak\b", r"\bst\s+depression\b", r"\bst\s+segment\s+depression\b"],
+        r"(-?\d{1,2}(?:\.\d+)?)\s*(?:mm)?",  # negative = ST elevation, as in the training data
+        {},
+        float,
+        (-5.0, 10.0),
+    ),
+}
+
+# Categorical fields: label synonyms -> ordered (value regex, normalized value) pairs
+_CATEGORICAL_RULES = {
+    "Sex": (
+        [r"\bsex\b", r"\bgender\b"],
+        [(r"\bfemale\b|\bf\b", "Female"), (r"\bmale\b|\bm\b", "Male")],
+    ),
+    "ChestPainType": (
+        [r"\bchest\s+pain(?:\s+type)?\b", r"\bcp\s+type\b"],
+        [
+            (r"\batypical\b|\bata\b", "ATA"),
+            (r"\btypical\b|\bta\b", "TA"),
+            (r"\bnon[-\s]?anginal\b|\bnap\b", "NAP"),
+            (r"\basymptomatic\b|\basy\b|\bnone\b|\bno\s+chest\s+pain\b", "ASY"),
+        ],
+    ),
+    "RestingECG": (
+        [r"\bresting\s+ecg\b", r"\bresting\s+ekg\b", r"\becg\b", r"\bekg\b", r"\bresting\s+electrocardiogra\w*\b"],
+        [
+            (r"\blvh\b|left\s+ventricular\s+hypertrophy", "LVH"),
+            (r"\bst[-\s]?t\b|\bst\s+(?:wave|segment)\s+abnormal\w*|\bst\b", "ST"),
+            (r"\bnormal\b|\bwnl\b|within\s+normal\s+limits", "Normal"),
+        ],
+    ),
+    "ExerciseAngina": (
+        [r"\bexercise[-\s]+induced\s+angina\b", r"\bexercise\s+angina\b", r"\bexang\b"],
+        [(r"\byes\b|\by\b|\bpresent\b|\bpositive\b", "Yes"), (r"\bno\b|\bn\b|\babsent\b|\bnegative\b", "No")],
+    ),
+    "ST_Slope": (
+        [r"\bst\s+slope\b", r"\bslope\s+of\s+(?:the\s+)?peak\s+exercise\s+st\s+segment\b", r"\bst\s+segment\s+slope\b"],
+        [
+            (r"\bup(?:sloping|ward)?\b", "Up"),
+            (r"\bflat\b|\bhorizontal\b", "Flat"),
+            (r"\bdown(?:sloping|ward)?\b", "Down"),
+        ],
+    ),
+}
+
+# Lipid sub-fractions that must not be read as total cholesterol
+_CHOLESTEROL_EXCLUDE = re.compile(r"\b(?:hdl|ldl|vldl|non[-\s]?hdl)\b", re.IGNORECASE)
+
+
+def _compile(labels):
+    return re.compile("(?:" + "|".join(labels) + ")", re.IGNORECASE)
+
+
+_NUMERIC = {
+    field: (_compile(labels), re.compile(_SEP + value, re.IGNORECASE), conversions, cast, bounds)
+    for field, (labels, value, conversions, cast, bounds) in _NUMERIC_RULES.items()
+}
+_CATEGORICAL = {
+    field: (_compile(labels), [(re.compile(pattern, re.IGNORECASE), value) for pattern, value in values])
+    for field, (labels, values) in _CATEGORICAL_RULES.items()
+}
+
+# Label pattern per field, e.g. for judging whether a page mentions any field at all
+FIELD_LABELS = {field: rules[0] for field, rules in {**_NUMERIC, **_CATEGORICAL}.items()}
+
+_VALUE_START = re.compile(_SEP)
+# "No ST-T changes", "not present": a negated finding is left to the LLM
+_NEGATION = re.compile(r"\b(?:no|not|without|denies|denied|negative\s+for)\b", re.IGNORECASE)
+# A categorical value ends at a wide gap or where the next "Label:" on the line begins
+_VALUE_END = re.compile(r"\s{2,}|[^\s:]+\s*:")
+
+
+def _numeric_value(field, line):
+    label, value, conversions, cast, (low, high) = _NUMERIC[field]
+    if field == "Cholesterol" and _CHOLESTEROL_EXCLUDE.search(line):
+        return None
+    for match in label.finditer(line):
+        found = value.match(line, match.end())
+        if not found:
+            continue
+        number = float(found.group(1))
+        unit = found.group(2) if found.lastindex and found.lastindex >= 2 else None
+        if unit:
+            number *= conversions.get(re.sub(r"\s+", "", unit.lower()), 1)
+        number = cast(round(number)) if cast is int else round(number, 2)
+        if low <= number <= high:
+            return number
+    return None
+
+
+def _categorical_value(field, line):
+    label, values = _CATEGORICAL[field]
+    match = label.search(line)
+    if not match:
+        return None
+    start = _VALUE_START.match(line, match.end()).end()
+    rest = line[start:start + 60]
+    if field == "Sex":
+        # "Age/Sex: 54/M" or "Age/Sex: 54 Y / Male"
+        rest = re.sub(r"^\d{1,3}\s*(?:years?|yrs?|y)?\s*/?\s*", "", rest, flags=re.IGNORECASE)
+    end = _VALUE_END.search(rest)
+    if end:
+        rest = rest[:end.start()]
+
+    # The value closest to the label wins, not the first pattern that matches anywhere
+    best = None
+    for pattern, value in values:
+        for found in pattern.finditer(rest):
+            # A bare letter (M/F, Y/N) only counts when it directly follows the separator
+            if len(found.group()) == 1 and found.start() > 0:
+                continue
+            if best is None or found.start() < best[0]:
+                best = (found.start(), value)
+            break
+    if best is None or _NEGATION.search(rest, 0, best[0]):
+        return None
+    return best[1]
+
+
+def extract_fields(text, fields=TARGET_FIELDS):
+    """
+    Pull the PROMPT fields out of lab-report text with deterministic rules.
+
+    Works line by line: a field is only read from a line carrying one of its
+    labels (with common synonyms and units), values outside a plausible range
+    are ignored, and the first match in the text wins. Returns the fields found,
+    formatted like the LLM's JSON (e.g. ChestPainType "ATA", ST_Slope "Up").
+    """
+    found = {}
+    for line in text.splitlines():
+        for field in fields:
+            if field in found:
+                continue
+            if field in _NUMERIC:
+                value = _numeric_value(field, line)
+            else:
+                value = _categorical_value(field, line)
+            if value is not None:
+                found[field] = value
+        if len(found) == len(fields):
+            break
+    return found
+
+
+def extract_fields_from_pages(pages_text, fields=TARGET_FIELDS):
+    """Run extract_fields over each page in order; earlier pages win."""
+    found = {}
+    for text in pages_text:
+        missing = [field for field in fields if field not in found]
+        if not missing:
+            break
+        found.update(extract_fields(text, missing))
+    return found
@@ -0,0 +1,42 @@
+import json
+
+from batch_ingest import find_pdfs, read_done
+
+
+def _write_output(path, records, tail=""):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+
+
+def test_read_done_missing_output(tmp_path):
+    assert read_done(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_read_done_ignores_truncated_last_line(tmp_path):
+    output = tmp_path / "out.jsonl"
+    _write_output(output, [{"path": "a.pdf", "result": {}}], tail='{"path": "b.pdf", "res')
+    assert read_done(str(output)) == {"a.pdf"}
+
+
+def test_read_done_retry_errors(tmp_path):
+    output = tmp_path / "out.jsonl"
+    _write_output(output, [
+        {"path": "a.pdf", "result": {}},
+        {"path": "b.pdf", "error": "RuntimeError: OCR failed"},
+        {"path": "c.pdf", "result": {}, "error": None},
+    ])
+    assert read_done(str(output)) == {"a.pdf", "b.pdf", "c.pdf"}
+    assert read_done(str(output), retry_errors=True) == {"a.pdf", "c.pdf"}
+
+
+def test_find_pdfs_recursive_and_sorted(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ["b.pdf", "a.PDF", "notes.txt", "sub/c.pdf"]:
+        (tmp_path / name).write_bytes(b"")
+    assert find_pdfs(str(tmp_path)) == [
+        str(tmp_path / "a.PDF"),
+        str(tmp_path / "b.pdf"),
+        str(tmp_path / "sub" / "c.pdf"),
+    ]
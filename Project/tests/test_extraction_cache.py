@@ -0,0 +1,52 @@
+import itertools
+
+import pytest
+
+import extraction_cache
+from extraction_cache import ExtractionCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A strictly increasing clock, so last_used order is deterministic
+    ticks = itertools.count(1)
+    monkeypatch.setattr(extraction_cache.time, "time", lambda: float(next(ticks)))
+
+
+def test_round_trip(tmp_path, clock):
+    cache = ExtractionCache(str(tmp_path / "cache.sqlite3"))
+    pages = [{"page": 1, "text": "Age: 54", "source": "text", "seconds": 0.1}]
+    cache.put_pages("a", pages)
+    cache.put_result("a", "v1", {"Age": 54})
+
+    assert cache.get_pages("a") == pages
+    assert cache.get_result("a", "v1") == {"Age": 54}
+    assert cache.get_result("a", "v2") is None
+    assert cache.get_pages("b") is None
+
+
+def test_evicts_least_recently_used_across_tables(tmp_path, clock):
+    payload = {"text": "x" * 100}
+    size = len(extraction_cache.json.dumps(payload))
+    cache = ExtractionCache(str(tmp_path / "cache.sqlite3"), max_bytes=3 * size)
+
+    cache.put_pages("a", payload)
+    cache.put_result("b", "v1", payload)
+    cache.put_pages("c", payload)
+    # Touch the oldest entry so the result for "b" becomes least recently used
+    assert cache.get_pages("a") == payload
+
+    cache.put_result("d", "v1", payload)
+
+    assert cache.get_result("b", "v1") is None
+    assert cache.get_pages("a") == payload
+    assert cache.get_pages("c") == payload
+    assert cache.get_result("d", "v1") == payload
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+
+    cache.put_pages("e", payload)
+    # "a" was read before "c", so it goes next
+    assert cache.get_pages("a") is None
+    assert cache.get_pages("c") == payload
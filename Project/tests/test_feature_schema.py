@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_schema import encode_patient, encode_patients, load_schema
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_PATH = os.path.join(PROJECT_DIR, "heart_disease_schema.json")
+CSV_PATH = os.path.join(PROJECT_DIR, "heart1.csv")
+
+PATIENTS = [
+    # Training-style values
+    {"Age": 40, "Sex": "M", "ChestPainType": "ATA", "RestingBP": 140, "Cholesterol": 289, "FastingBS": 0,
+     "RestingECG": "Normal", "MaxHR": 172, "ExerciseAngina": "N", "Oldpeak": 0.0, "ST_Slope": "Up"},
+    # App-style values, some outside the training vocabulary
+    {"Age": 65, "Sex": "Male", "ChestPainType": "ASY", "RestingBP": 160, "Cholesterol": 280, "FastingBS": 1,
+     "RestingECG": "ST", "MaxHR": 120, "ExerciseAngina": "Yes", "Oldpeak": -1.5, "ST_Slope": "Flat"},
+    # Missing columns
+    {"Age": 54, "Sex": "F", "Cholesterol": 230},
+]
+
+
+def _legacy_encode(patient, features):
+    """The original predict_heart_disease encoding: get_dummies, add missing columns, reorder."""
+    x = pd.get_dummies(pd.DataFrame([patient]))
+    for col in features:
+        if col not in x.columns:
+            x[col] = 0
+    return x[features].to_numpy(dtype=np.float32)[0]
+
+
+@pytest.mark.parametrize("patient", PATIENTS)
+def test_encode_patient_matches_get_dummies(patient):
+    features = load_schema(SCHEMA_PATH)["features"]
+    expected = _legacy_encode(patient, features)
+    np.testing.assert_array_equal(encode_patient(patient, schema_path=SCHEMA_PATH), expected)
+
+    # A reused output vector is cleared first
+    out = np.full(len(features), 7, dtype=np.float32)
+    np.testing.assert_array_equal(encode_patient(patient, out=out, schema_path=SCHEMA_PATH), expected)
+
+
+def test_encode_patients_matches_get_dummies_on_training_rows():
+    features = load_schema(SCHEMA_PATH)["features"]
+    rows = pd.read_csv(CSV_PATH).drop(columns=["HeartDisease"]).head(50).to_dict("records")
+    expected = np.stack([_legacy_encode(row, features) for row in rows])
+
+    x, _ = encode_patients(rows, schema_path=SCHEMA_PATH)
+    np.testing.assert_array_equal(x, expected)
+    np.testing.assert_array_equal(np.stack([encode_patient(row, schema_path=SCHEMA_PATH) for row in rows]), expected)
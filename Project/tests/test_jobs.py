@@ -0,0 +1,79 @@
+import threading
+
+from jobs import Job, JobCancelled, JobRunner
+
+
+def _wait(job, timeout=5):
+    job._future.result(timeout=timeout)
+    return job.snapshot()
+
+
+def test_cancel_runs_callbacks_once():
+    job = Job()
+    calls = []
+    job.on_cancel(lambda: calls.append("a"))
+    job.on_cancel(lambda: calls.append("b"))
+    job.cancel()
+    job.cancel()
+    assert calls == ["a", "b"]
+    assert job.cancelled
+
+
+def test_on_cancel_after_cancel_runs_immediately():
+    job = Job()
+    job.cancel()
+    calls = []
+    job.on_cancel(lambda: calls.append("late"))
+    assert calls == ["late"]
+
+
+def test_runner_statuses():
+    runner = JobRunner(max_workers=1)
+    done = runner.submit(lambda job, x: x * 2, 21)
+    failed = runner.submit(lambda job: 1 / 0)
+
+    assert _wait(done)["status"] == "done"
+    assert done.result == 42
+    snapshot = _wait(failed)
+    assert snapshot["status"] == "failed"
+    assert snapshot["error"].startswith("ZeroDivisionError")
+
+
+def test_cancel_interrupts_running_job():
+    runner = JobRunner(max_workers=1)
+    started = threading.Event()
+    interrupted = threading.Event()
+
+    def work(job):
+        job.on_cancel(interrupted.set)
+        started.set()
+        assert interrupted.wait(timeout=5)
+        job.raise_if_cancelled()
+
+    job = runner.submit(work)
+    assert started.wait(timeout=5)
+    runner.cancel(job.id)
+    assert _wait(job)["status"] == "cancelled"
+
+
+def test_cancelled_queued_job_never_starts():
+    runner = JobRunner(max_workers=1)
+    release = threading.Event()
+    ran = []
+    blocker = runner.submit(lambda job: release.wait(timeout=5))
+    queued = runner.submit(lambda job: ran.append(job.id))
+
+    queued.cancel()
+    release.set()
+    _wait(blocker)
+    assert queued.snapshot()["status"] == "cancelled"
+    assert ran == []
+    assert runner.get_stats()["cancelled"] == 1
+
+
+def test_job_cancelled_exception_marks_job_cancelled():
+    def work(job):
+        raise JobCancelled()
+
+    runner = JobRunner(max_workers=1)
+    assert _wait(runner.submit(work))["status"] == "cancelled"
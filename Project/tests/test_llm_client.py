@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_backends import BackendError, FakeBackend
+from llm_client import LLMClient, TokenBucket
+
+MESSAGES = [{"role": "user", "content": "Age: 54\nResting BP: 140 mmHg"}]
+
+
+def make_client(backend, **kwargs):
+    options = dict(requests_per_minute=6000, tokens_per_minute=10**9, base_delay=0.001, max_delay=0.01)
+    options.update(kwargs)
+    return LLMClient(backend, "test-model", **options)
+
+
+def test_token_bucket_goes_into_debt():
+    bucket = TokenBucket(60)  # one token per second
+    assert bucket.reserve(60) == 0
+    # Empty bucket: the next caller waits for its share to refill
+    assert bucket.reserve(2) == pytest.approx(2, abs=0.2)
+    assert bucket.reserve(1) == pytest.approx(3, abs=0.2)
+
+
+def test_token_bucket_refund():
+    bucket = TokenBucket(60)
+    bucket.reserve(60)
+    bucket.reserve(5)
+    bucket.refund(5)
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.2)
+
+
+def test_cancelled_acquire_refunds():
+    bucket = TokenBucket(60)
+    bucket.reserve(60)
+
+    async def cancel_waiter():
+        waiter = asyncio.ensure_future(bucket.acquire(30))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(cancel_waiter())
+    # The cancelled caller's 30 tokens are available again
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.2)
+
+
+def test_cancelled_call_returns_its_reservation():
+    client = make_client(FakeBackend(latency=0, jitter=0), requests_per_minute=60)
+    client._requests.reserve(60)
+
+    async def cancel_call():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.complete_json(MESSAGES), timeout=0.05)
+
+    asyncio.run(cancel_call())
+    assert client._requests.reserve(1) == pytest.approx(1, abs=0.2)
+    assert client.get_metrics()["attempts"] == 0
+
+
+def test_success():
+    client = make_client(FakeBackend(latency=0, jitter=0))
+    result = asyncio.run(client.complete_json(MESSAGES))
+    assert result["Age"] == 54
+    assert result["RestingBP"] == 140
+
+
+def test_retries_are_bounded():
+    backend = FakeBackend(latency=0, jitter=0, error_rate=1.0)
+    client = make_client(backend, max_attempts=3)
+    with pytest.raises(BackendError):
+        asyncio.run(client.complete_json(MESSAGES))
+    metrics = client.get_metrics()
+    assert backend.calls == 3
+    assert (metrics["attempts"], metrics["retries"], metrics["failures"]) == (3, 2, 1)
+    assert metrics["backoff_wait_seconds"] <= 2 * 0.01
+
+
+def test_rate_limited_retries_honour_retry_after():
+    client = make_client(FakeBackend(latency=0, jitter=0, rate_limit_rate=1.0, retry_after=0.02), max_attempts=2)
+    with pytest.raises(BackendError):
+        asyncio.run(client.complete_json(MESSAGES))
+    metrics = client.get_metrics()
+    assert metrics["rate_limited"] == 1
+    # Retry-After wins over the (much shorter) exponential backoff
+    assert metrics["backoff_wait_seconds"] >= 0.02
+
+
+def test_non_retryable_errors_fail_fast():
+    class Unauthorized:
+        calls = 0
+
+        async def complete(self, messages, model):
+            self.calls += 1
+            raise BackendError("invalid api key", status_code=401)
+
+    backend = Unauthorized()
+    client = make_client(backend, max_attempts=5)
+    with pytest.raises(BackendError):
+        asyncio.run(client.complete_json(MESSAGES))
+    assert backend.calls == 1
+
+
+class ScriptedBackend(FakeBackend):
+    """FakeBackend whose calls take the given latencies in order; cancelled calls are counted."""
+
+    def __init__(self, latencies):
+        super().__init__(latency=0, jitter=0)
+        self.latencies = iter(latencies)
+        self.cancelled = 0
+
+    async def complete(self, messages, model):
+        delay = next(self.latencies)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return await super().complete(messages, model)
+
+
+def run_hedged(backend, **kwargs):
+    client = make_client(backend, hedge_percentile=50, hedge_min_samples=3, **kwargs)
+
+    async def calls():
+        for _ in range(3):
+            await client.complete_json(MESSAGES)
+        start = time.perf_counter()
+        result = await client.complete_json(MESSAGES)
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(calls())
+    return client.get_metrics(), result, elapsed
+
+
+def test_slow_request_is_hedged_and_loser_cancelled():
+    backend = ScriptedBackend([0.01, 0.01, 0.01, 2.0, 0.01])
+    metrics, result, elapsed = run_hedged(backend, hedge_budget=0.5)
+    assert result["Age"] == 54
+    assert elapsed < 1.0
+    assert (metrics["hedges"], metrics["hedges_won"]) == (1, 1)
+    assert backend.cancelled == 1
+
+
+def test_hedges_are_capped_by_budget():
+    backend = ScriptedBackend([0.01, 0.01, 0.01, 0.3])
+    metrics, _, elapsed = run_hedged(backend, hedge_budget=0.1)
+    assert elapsed >= 0.3
+    assert (metrics["hedges"], metrics["hedges_over_budget"]) == (0, 1)
+    assert backend.calls == 4
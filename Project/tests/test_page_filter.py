@@ -0,0 +1,55 @@
+from page_filter import compact_text, filter_pages, repeated_lines
+
+HEADER = "St. Mary Cardiology Clinic"
+
+
+def _page(number, total, body):
+    return f"{HEADER}\n{body}\nPage {number} of {total}"
+
+
+def test_repeated_header_and_footer_are_stripped():
+    pages = [
+        _page(1, 3, "Age: 54\nSex: Male"),
+        _page(2, 3, "Cholesterol: 230 mg/dL"),
+        _page(3, 3, "Max HR: 150"),
+    ]
+    kept, report = filter_pages(pages)
+    assert kept == ["Age: 54\nSex: Male", "Cholesterol: 230 mg/dL", "Max HR: 150"]
+    assert report["pages_in"] == 3
+    assert report["pages_kept"] == 3
+    assert report["tokens_saved"] == (report["chars_in"] - report["chars_out"]) // 4
+
+
+def test_single_page_keeps_its_header():
+    assert repeated_lines([_page(1, 1, "Age: 54")]) == set()
+    kept, _ = filter_pages([_page(1, 1, "Age: 54")])
+    assert kept == [f"{HEADER}\nAge: 54\nPage 1 of 1"]
+
+
+def test_labeled_line_is_kept_even_when_repeated():
+    pages = [_page(1, 2, "Age: 54\nNotes   pending"), _page(2, 2, "Age: 54\nSex: Male")]
+    kept, _ = filter_pages(pages)
+    assert kept == ["Age: 54\nNotes pending", "Age: 54\nSex: Male"]
+
+
+def test_pages_without_labels_are_dropped():
+    pages = ["Consent form\nSigned by the patient", "Resting BP: 130 mmHg", "Disclaimer"]
+    kept, report = filter_pages(pages)
+    assert kept == ["Resting BP: 130 mmHg"]
+    assert report["pages_kept"] == 1
+
+
+def test_all_pages_kept_when_none_is_labeled():
+    pages = ["Consent form", "Discharge summary"]
+    kept, _ = filter_pages(pages)
+    assert kept == pages
+
+
+def test_only_pages_for_requested_fields_are_kept():
+    pages = ["Age: 54\nSex: Male", "Cholesterol: 230 mg/dL"]
+    kept, _ = filter_pages(pages, ["Cholesterol"])
+    assert kept == ["Cholesterol: 230 mg/dL"]
+
+
+def test_compact_text_collapses_whitespace_and_blank_lines():
+    assert compact_text("  Age:\t54  \n\n\nSex:   Male ") == "Age: 54\nSex: Male"
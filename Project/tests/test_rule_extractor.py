@@ -0,0 +1,81 @@
+import pytest
+
+from rule_extractor import extract_fields
+
+
+@pytest.mark.parametrize(
+    "line, field, expected",
+    [
+        # The value next to the label wins over a later token in the same window
+        ("Sex: Male  Consultant: Dr F Rao", "Sex", "Male"),
+        ("Sex: M   Ref. By: Dr. F. Khan", "Sex", "Male"),
+        ("Sex: M Ref. By: Dr. F. Khan", "Sex", "Male"),
+        ("Chest pain: typical angina, no atypical features", "ChestPainType", "TA"),
+        ("ECG: normal; no ST changes", "RestingECG", "Normal"),
+        ("Exercise induced angina: No (yes to dyspnea)", "ExerciseAngina", "No"),
+        # Combined and abbreviated labels still resolve
+        ("Age/Sex: 54/M", "Sex", "Male"),
+        ("Age/Sex: 54 Y / Female", "Sex", "Female"),
+        ("Gender - F", "Sex", "Female"),
+        ("Chest Pain Type: Atypical Angina", "ChestPainType", "ATA"),
+        ("Resting ECG: ST-T wave abnormality", "RestingECG", "ST"),
+        ("Exercise Angina: Y", "ExerciseAngina", "Yes"),
+        ("ST Slope: Flat", "ST_Slope", "Flat"),
+    ],
+)
+def test_categorical_value(line, field, expected):
+    assert extract_fields(line)[field] == expected
+
+
+@pytest.mark.parametrize(
+    "line, field",
+    [
+        # A bare letter further along is not taken as the value
+        ("Sex: not recorded, see f/u notes", "Sex"),
+        ("Exercise angina: see stress test n 2", "ExerciseAngina"),
+        # Nothing after the next "Label:" belongs to this field
+        ("Sex:  Ref. By: Dr. F. Khan", "Sex"),
+        # Negated findings are left to the LLM
+        ("ECG: No ST-T changes", "RestingECG"),
+        ("Resting ECG: no significant ST changes", "RestingECG"),
+        ("Exercise induced angina: not present", "ExerciseAngina"),
+        ("Chest pain: denies typical angina", "ChestPainType"),
+    ],
+)
+def test_categorical_value_not_found(line, field):
+    assert field not in extract_fields(line)
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("Oldpeak -1.5", -1.5),
+        ("Oldpeak: -0.5 mm", -0.5),
+        ("ST Depression (Oldpeak): 1.4", 1.4),
+        ("Oldpeak - 1.5", 1.5),
+        ("Oldpeak = 2", 2.0),
+    ],
+)
+def test_oldpeak_sign(line, expected):
+    assert extract_fields(line)["Oldpeak"] == expected
+
+
+def test_sample_report():
+    text = "\n".join([
+        "Patient: John Doe        Age: 54 Years        Sex: Male",
+        "Resting Blood Pressure: 142/90 mmHg",
+        "Total Cholesterol: 238 mg/dL",
+        "HDL Cholesterol: 45 mg/dL",
+        "Fasting Blood Sugar: 7 mmol/L",
+        "Resting ECG: Normal",
+        "Maximum Heart Rate Achieved: 138 bpm",
+        "Exercise Induced Angina: No",
+        "ST Depression (Oldpeak): 1.4",
+        "ST Slope: Flat",
+        "Chest Pain Type: Atypical Angina",
+    ])
+    assert extract_fields(text) == {
+        "Age": 54, "Sex": "Male", "ChestPainType": "ATA", "RestingBP": 142, "Cholesterol": 238,
+        "FastingBS": 126, "RestingECG": "Normal", "MaxHR": 138, "ExerciseAngina": "No",
+        "Oldpeak": 1.4, "ST_Slope": "Flat",
+    }
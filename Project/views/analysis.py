@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from prediction_model import predict_heart_disease, calculate_cardiovascular_age
+from micro_batcher import predict_heart_disease_batched
+from prediction_model import calculate_cardiovascular_age, db_row_to_patient
 from db import get_db_connection
 from tips import generate_health_tips
 
@@ -39,39 +40,8 @@ def get_user_details(user_id):
             for i, (key, value) in enumerate(original_details.items()):
                 cols[i % 2].markdown(f"**{key}**: {value}")
 
-            # Apply mappings for transformed values
-            chest_pain_type_map = {
-                "Typical Chest Pain During Activity": "TA",
-                "Unusual Chest Pain": "ATA",
-                "Discomfort around Chest Area": "NAP",
-                "No Chest Pain / Silent Symptoms": "ASY"
-            }
-            resting_ecg_map = {
-                "Normal": "Normal",
-                "ST-T Wave Abnormality": "ST",
-                "Left Ventricular Hypertrophy": "LVH"
-            }
-            st_slope_map = {
-                "Upsloping": "Up",
-                "Flat": "Flat",
-                "Downsloping": "Down"
-            }
-            fasting_bs = 0 if user_data[5] < 120 else 1
-
-            # Create transformed user_details
-            user_details = {
-                "Age": user_data[0],
-                "Sex": user_data[1],
-                "ChestPainType": chest_pain_type_map.get(user_data[2], user_data[2]),
-                "RestingBP": user_data[3],
-                "Cholesterol": user_data[4],
-                "FastingBS": fasting_bs,
-                "RestingECG": resting_ecg_map.get(user_data[6], user_data[6]),
-                "MaxHR": user_data[7],
-                "ExerciseAngina": user_data[8],
-                "Oldpeak": user_data[9],
-                "ST_Slope": st_slope_map.get(user_data[10], user_data[10]),
-            }
+            # Map DB labels to the codes the model expects
+            user_details = db_row_to_patient(user_data)
             
             return user_details
         else:
@@ -104,7 +74,8 @@ else:
     user_data = get_user_details(user_id)    
     if user_data:    
         if st.button("Analyze"):
-            predicted, probability, risk_level, flagged = predict_heart_disease(user_data)
+            # Concurrent sessions' requests are scored together by the shared micro-batcher
+            predicted, probability, risk_level, flagged = predict_heart_disease_batched(user_data, timeout=30)
             cardio_age = calculate_cardiovascular_age(user_data)            
             try:
                 conn = get_db_connection()
@@ -1,16 +1,18 @@
 import streamlit as st
 import pandas as pd
+import asyncio
 import io
 import sys
 import os
-import time
 import re
 
 # Add the project directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db import get_db_connection
-from ocr import extract_medical_data
+from jobs import JobCancelled, get_job_runner
+from ocr import extract_medical_data_async
+from rule_extractor import TARGET_FIELDS
 from validations import validate_health_data
 
 import bcrypt
@@ -116,6 +118,80 @@ def save_health_data_to_db(health_data):
         conn.close()
 
 
+def run_extraction_job(job, pdf_bytes):
+    """Background job: extract fields from the uploaded PDF, reporting page progress to the job."""
+    job.update(progress=0.05, message="Scanning document...")
+
+    def report(done, total, partial):
+        # Real page completions: 10% once text is extracted, the rest per LLM page
+        fraction = done / total if total else 1.0
+        job.update(
+            progress=0.1 + 0.85 * fraction,
+            message=f"Processing data... {done}/{total} pages, {len(partial)} of {len(TARGET_FIELDS)} fields found",
+        )
+        job.raise_if_cancelled()
+
+    async def extract():
+        # Cancel interrupts the job's task at once, even while it waits on a slow LLM page;
+        # the text/OCR stage blocks the loop, so it checks between pages instead
+        loop, task = asyncio.get_running_loop(), asyncio.current_task()
+
+        def interrupt():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # the extraction already finished and its loop is closed
+
+        job.on_cancel(interrupt)
+        try:
+            return await asyncio.wait_for(
+                extract_medical_data_async(pdf_bytes, progress=report, check_cancelled=job.raise_if_cancelled),
+                timeout=300,
+            )
+        except asyncio.CancelledError:
+            raise JobCancelled()
+
+    return asyncio.run(extract())
+
+
+@st.fragment(run_every=1)
+def show_extraction_job():
+    """Poll the session's extraction job once a second without rerunning the whole page."""
+    runner = get_job_runner()
+    job_id = st.session_state.get("extraction_job_id")
+    job = runner.get(job_id) if job_id else None
+    if job is None:
+        st.session_state.pop("extraction_job_id", None)
+        st.warning("The extraction job is no longer available. Please extract again.")
+        return
+
+    state = job.snapshot()
+    if state["status"] in ("queued", "running"):
+        st.progress(int(state["progress"] * 100))
+        st.text(state["message"] or "Waiting for a free extraction slot...")
+        if st.button("Cancel extraction"):
+            runner.cancel(job_id)
+        return
+
+    # Finished: collect the result once, then rerun the page so the form is pre-filled
+    runner.forget(job_id)
+    del st.session_state["extraction_job_id"]
+    if state["status"] == "done":
+        extracted_metrics = state["result"]
+        if extracted_metrics:
+            st.session_state['pdf_processing_complete'] = True
+            for key in list(validate_health_data(extracted_metrics).keys()):
+                extracted_metrics.pop(key, None)
+            st.session_state["extracted_metrics"] = extracted_metrics
+        else:
+            st.session_state["extraction_notice"] = "No data extracted."
+    elif state["status"] == "failed":
+        st.session_state["extraction_notice"] = f"Error: {state['error']}"
+    else:
+        st.session_state["extraction_notice"] = "Extraction cancelled."
+    st.rerun()
+
+
 def show_upload_tab():
     st.subheader("Upload Medical Document for Scanning")
     st.write("Upload your medical report such as Heart report, Blood report, Complete blood count report, Lipid profile, Diabetic profile etc. as a PDF...")
@@ -125,43 +201,18 @@ def show_upload_tab():
     if uploaded_file:
         st.write({"Filename": uploaded_file.name, "Size": f"{uploaded_file.size / 1024:.2f} KB"})
         
-        if st.button("Extract Data from PDF"):
-            progress_text = st.empty()
-            progress_bar = st.progress(0)
-            
-            try:
-                progress_text.text("Initiating OCR scan...")
-                time.sleep(1)
-                progress_bar.progress(25)
-                
-                with open("temp_uploaded.pdf", "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                
-                progress_bar.progress(50)
-                progress_text.text("Scanning document...")
-                time.sleep(1)
-                
-                extracted_metrics = extract_medical_data("temp_uploaded.pdf")
-                
-                progress_bar.progress(75)
-                progress_text.text("Processing data...")
-                time.sleep(1)
-                
-                if extracted_metrics:
-                    st.session_state['pdf_processing_complete'] = True
-                    for key in list(validate_health_data(extracted_metrics).keys()):
-                        extracted_metrics.pop(key, None)
-                    st.session_state["extracted_metrics"] = extracted_metrics                    
-                    progress_bar.progress(100)
-                    progress_text.text("Scan complete!")  
-                    st.write(extracted_metrics)
-                else:
-                    st.warning("No data extracted.")
-            except Exception as e:
-                st.error(f"Error: {e}")
-            finally:
-                if os.path.exists("temp_uploaded.pdf"):
-                    os.remove("temp_uploaded.pdf")
+        if st.button("Extract Data from PDF", disabled="extraction_job_id" in st.session_state):
+            # Runs on the shared job runner; only the id lives in the session, so reruns don't lose it
+            job = get_job_runner().submit(run_extraction_job, uploaded_file.getvalue())
+            st.session_state["extraction_job_id"] = job.id
+
+    if "extraction_job_id" in st.session_state:
+        show_extraction_job()
+    elif "extraction_notice" in st.session_state:
+        st.warning(st.session_state.pop("extraction_notice"))
+    elif st.session_state.get('pdf_processing_complete') and st.session_state.get("extracted_metrics"):
+        st.success("Scan complete!")
+        st.write(st.session_state["extracted_metrics"])
 
 
 def is_valid_email(email):